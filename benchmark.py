@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Renders every animation headlessly and reports per-frame timings.
+
+Usage:
+  python benchmark.py                          # All animations, 300 frames each
+  python benchmark.py -n 600 Plasma 'Spiral'   # Only the named animations
+  python benchmark.py --budget-ms 8 --budgets budgets.json --output bench.json
+
+The budgets file is a JSON object mapping animation names to a per-frame
+budget in milliseconds, overriding --budget-ms for those animations. The run
+exits with status 1 if any animation's p95 frame time exceeds its budget.
+"""
+
+import argparse
+import json
+import sys
+import time
+
+import numpy as np
+
+from config import POSITIVE_COLOR, NEGATIVE_COLOR, GAMMA, TARGET_FPS
+from utils.registry import ANIMATIONS, ANIMATION_PALETTES
+from utils.backends import HeadlessBackend
+from utils.display import Display
+from utils.geometry import get_geometry
+from utils.palette import get_palette
+from utils.render import make_renderer
+
+STAGES = ("compute", "color", "push", "total")
+PERCENTILES = (50, 95, 99)
+
+
+class FrameTimings:
+    """
+    Takes the stages make_renderer records (see utils.profiling) into one
+    row per frame. Simulation steps are not taken out of compute.
+    """
+
+    def __init__(self, frames):
+        self.timings = np.zeros((frames, len(STAGES)))
+        self.frame = 0
+
+    def record(self, stage, seconds):
+        self.timings[self.frame, STAGES.index(stage)] += seconds
+
+    def take_simulated(self):
+        return 0.0
+
+
+def benchmark_animation(name, func, frames, fps, width=16, height=16):
+    """
+    Renders `frames` frames of one animation at simulated times n / fps and
+    returns the per-stage timings in seconds as an array of shape
+    (frames, len(STAGES)).
+    """
+    hat = HeadlessBackend(width, height, max_frames=1)
+    display = Display(hat, width, height)
+    geometry = get_geometry(width, height)
+    palette = get_palette(
+        ANIMATION_PALETTES.get(name), POSITIVE_COLOR, NEGATIVE_COLOR, GAMMA
+    )
+    ANIMATIONS.set_max_steps(name, (height, width), None)
+    recorder = FrameTimings(frames)
+    render = make_renderer(name, func, geometry, palette, fps=fps, profile=recorder)
+
+    clock = time.perf_counter
+    for n in range(frames):
+        recorder.frame = n
+        start = clock()
+        rgb = render(n / fps)
+        rendered = clock()
+        display.show(rgb)
+        pushed = clock()
+        recorder.record("push", pushed - rendered)
+        recorder.record("total", pushed - start)
+    return recorder.timings
+
+
+def summarize(timings, width=16, height=16):
+    """Returns the percentiles (in ms) of each stage and the pixel rate."""
+    summary = {}
+    for column, stage in enumerate(STAGES):
+        values = np.percentile(timings[:, column], PERCENTILES) * 1000
+        summary[stage] = {
+            f"p{p}_ms": round(float(v), 4) for p, v in zip(PERCENTILES, values)
+        }
+    total = timings[:, -1].sum()
+    summary["pixels_per_sec"] = (
+        round(width * height * len(timings) / total) if total > 0 else None
+    )
+    return summary
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Benchmark the render cost of every animation."
+    )
+    parser.add_argument("animations", nargs="*", help="Animations to run (default all)")
+    parser.add_argument("-n", "--frames", type=int, default=300)
+    parser.add_argument("--fps", type=float, default=TARGET_FPS)
+    parser.add_argument(
+        "--budget-ms",
+        type=float,
+        default=None,
+        help="Per-frame p95 budget in ms (default: 1000 / fps)",
+    )
+    parser.add_argument("--budgets", help="JSON file of per-animation budgets in ms")
+    parser.add_argument("-o", "--output", help="Write the results as JSON here")
+    args = parser.parse_args(argv)
+
+    names = args.animations or list(ANIMATIONS)
+    unknown = [name for name in names if name not in ANIMATIONS]
+    if unknown:
+        parser.error(f"unknown animations: {', '.join(unknown)}")
+
+    default_budget = args.budget_ms if args.budget_ms else 1000.0 / args.fps
+    budgets = {}
+    if args.budgets:
+        with open(args.budgets) as f:
+            budgets = json.load(f)
+
+    results = {}
+    failed = []
+    print(f"{'Animation':<30} {'p50':>8} {'p95':>8} {'p99':>8} {'budget':>8}  (ms)")
+    for name in names:
+        timings = benchmark_animation(name, ANIMATIONS[name], args.frames, args.fps)
+        summary = summarize(timings)
+        budget = float(budgets.get(name, default_budget))
+        summary["budget_ms"] = budget
+        summary["passed"] = summary["total"]["p95_ms"] <= budget
+        results[name] = summary
+        if not summary["passed"]:
+            failed.append(name)
+
+        total = summary["total"]
+        print(
+            f"{name:<30} {total['p50_ms']:>8.3f} {total['p95_ms']:>8.3f} "
+            f"{total['p99_ms']:>8.3f} {budget:>8.3f}"
+            + ("" if summary["passed"] else "  OVER BUDGET")
+        )
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(
+                {"frames": args.frames, "fps": args.fps, "animations": results},
+                f,
+                indent=2,
+            )
+
+    if failed:
+        print(f"{len(failed)} animation(s) over budget: {', '.join(failed)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
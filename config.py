@@ -0,0 +1,19 @@
+"""
+Colours and frame rate shared by main.py, demo.py, record.py and
+benchmark.py, so previews, recordings and benchmarks match the clock.
+"""
+
+# -- Clock Colours --
+HOUR_COLOR = (255, 255, 255)
+MINUTE_COLOR = (255, 100, 0)
+
+# -- Animation Colours --
+# The two-tone palette of animations without a gradient (see
+# utils.registry.ANIMATION_PALETTES)
+POSITIVE_COLOR = HOUR_COLOR
+NEGATIVE_COLOR = MINUTE_COLOR
+# Gamma applied when building the colour lookup tables (1.0 = linear)
+GAMMA = 1.0
+
+# Frame rate animations are paced, cached and recorded at
+TARGET_FPS = 60
@@ -1,53 +1,107 @@
-import time
 import random
+import signal
 import sys
-from utils.animations import ANIMATIONS
+import time
+from utils.registry import ANIMATIONS, ANIMATION_PALETTES, ANIMATION_PERIODS
+from utils.render import make_renderer
+from utils.frame_cache import FrameCache
+from utils.formula import load_formulas
+from utils.geometry import get_geometry
+from utils.palette import get_palette
+from utils.canvas import load_canvas, open_canvas_display
+from utils.frame_clock import FrameClock
+from utils import profiling
+from utils.playback import MappedRecording, Player, find_recording
+from utils.recording import FILE_SUFFIX
+from utils.backends import backend_from_argv
+from config import POSITIVE_COLOR, NEGATIVE_COLOR, GAMMA, TARGET_FPS
 
-# Use the same colors as main.py
-POSITIVE_COLOR = (255, 255, 255)
-NEGATIVE_COLOR = (255, 100, 0)
+PANELS = None  # Multi-panel canvas, see PANELS in main.py
 
 try:
-    import unicornhathd
+    hat = load_canvas(backend_from_argv(sys.argv), PANELS)
 except ImportError:
     print("This script requires the unicornhathd library and hardware.")
+    print("Use --backend headless to run without them.")
     exit(1)
 
-WIDTH, HEIGHT = unicornhathd.get_shape()
+WIDTH, HEIGHT = hat.get_shape()
 
 DURATION = 30  # seconds per animation in cycle mode
 SINGLE_ANIM_DURATION = 60  # seconds when running a specific animation
+DISPLAY_LATENCY = 1  # Frames queued for the display thread, 0 to push inline
+FRAME_CACHE = True  # Replay pre-rendered cycles of periodic animations
+RECORDINGS_DIR = None  # Directory of record.py recordings to play instead
+
+
+def pop_option(argv, flag, default=None):
+    """Removes `flag VALUE` from argv and returns VALUE (default if absent)."""
+    if flag in argv:
+        n = argv.index(flag)
+        if n + 1 < len(argv):
+            value = argv[n + 1]
+            del argv[n : n + 2]
+            return value
+    return default
+
 
+# Playback options for recordings
+PLAYBACK_RATE = float(pop_option(sys.argv, "--rate", 1.0))
+PLAYBACK_SEEK = float(pop_option(sys.argv, "--seek", 0.0))
+PLAYBACK_LOOP = "--once" not in sys.argv
+if not PLAYBACK_LOOP:
+    sys.argv.remove("--once")
 
-def run_animation(name, func, duration):
+
+def run_animation(display, name, func, duration, cache=None, recording=None):
     print(f"Running animation: {name}")
-    start_time = time.time()
-    while time.time() - start_time < duration:
-        t = time.time() - start_time
-        for y in range(HEIGHT):
-            for x in range(WIDTH):
-                i = y * WIDTH + x
-                value = func(t, i, x, y)
-                value = max(-1.0, min(1.0, value))
-                # Use POSITIVE_COLOR and NEGATIVE_COLOR for mapping
-                if value > 0:
-                    r = int(POSITIVE_COLOR[0] * value)
-                    g = int(POSITIVE_COLOR[1] * value)
-                    b = int(POSITIVE_COLOR[2] * value)
-                elif value < 0:
-                    r = int(NEGATIVE_COLOR[0] * -value)
-                    g = int(NEGATIVE_COLOR[1] * -value)
-                    b = int(NEGATIVE_COLOR[2] * -value)
-                else:
-                    r, g, b = 0, 0, 0
-                unicornhathd.set_pixel(x, y, r, g, b)
-        unicornhathd.show()
-        time.sleep(1.0 / 60)
+    profile = profiling.begin(name)
+    if recording is None and RECORDINGS_DIR:
+        recording = find_recording(RECORDINGS_DIR, name, WIDTH, HEIGHT)
+    if recording is not None:
+        print(f"Playing recording: {recording.path}")
+        player = Player(recording, PLAYBACK_LOOP, PLAYBACK_RATE, PLAYBACK_SEEK)
+        render = player.render
+    else:
+        geometry = get_geometry(WIDTH, HEIGHT)
+        palette = get_palette(
+            ANIMATION_PALETTES.get(name), POSITIVE_COLOR, NEGATIVE_COLOR, GAMMA
+        )
+        render = make_renderer(
+            name,
+            func,
+            geometry,
+            palette,
+            ANIMATION_PERIODS.get(name),
+            TARGET_FPS,
+            cache,
+            profile,
+        )
+    clock = FrameClock(TARGET_FPS)
+    skipped = display.skipped_frames
+    while clock.elapsed() < duration:
+        rgb = render(clock.elapsed())
+        if rgb is None:  # Played a recording to the end with --once
+            break
+        pushing = time.perf_counter()
+        display.show(rgb)
+        sleeping = time.perf_counter()
+        clock.tick()
+        profile.record("push", sleeping - pushing)
+        profile.record("sleep", time.perf_counter() - sleeping)
+    display.flush()
+    profiling.end()
+    skipped = display.skipped_frames - skipped
+    print(f"Finished animation: {name} ({clock.stats}, {skipped} unchanged skipped)")
 
 
 def main():
-    unicornhathd.rotation(0)
-    unicornhathd.brightness(0.8)
+    # kill -USR1 <pid> prints the per-stage render timings
+    signal.signal(signal.SIGUSR1, lambda signum, frame: profiling.dump())
+    ANIMATIONS.update(load_formulas())
+    display = open_canvas_display(hat, DISPLAY_LATENCY)
+    cache = FrameCache() if FRAME_CACHE else None
+    hat.brightness(0.8)
 
     # Check if command line arguments were provided
     if len(sys.argv) > 1:
@@ -61,6 +115,10 @@ def main():
             print("Options:")
             print("  -h, --help     Show this help message")
             print("  -l, --list     List all available animations")
+            print("  --backend NAME Display backend: unicornhathd or headless")
+            print("  --rate X       Play recordings at X times their speed")
+            print("  --seek S       Start recordings S seconds in")
+            print("  --once         Play recordings once instead of looping")
             print()
             print("Available animations:")
             for name in sorted(ANIMATIONS.keys()):
@@ -76,7 +134,10 @@ def main():
             print(
                 "  python demo.py 'Plasma' 60         # Run Plasma animation for 60 seconds"
             )
-            unicornhathd.off()
+            print(
+                "  python demo.py plasma.rec --rate 2 # Play a recording at double speed"
+            )
+            hat.off()
             return
 
         # List available animations
@@ -84,7 +145,7 @@ def main():
             print("Available animations:")
             for name in sorted(ANIMATIONS.keys()):
                 print(f"  - {name}")
-            unicornhathd.off()
+            hat.off()
             return
 
         # Check if duration was specified
@@ -98,6 +159,35 @@ def main():
                     f"Invalid duration value. Using default: {SINGLE_ANIM_DURATION} seconds"
                 )
 
+        # Play a recording file directly
+        if animation_name.endswith(FILE_SUFFIX):
+            try:
+                recording = MappedRecording(animation_name)
+            except (OSError, ValueError) as e:
+                print(f"Could not open recording: {e}")
+                hat.off()
+                return
+            if (recording.info.width, recording.info.height) != (WIDTH, HEIGHT):
+                print(
+                    f"Recording is {recording.info.width}x{recording.info.height}, "
+                    f"the display is {WIDTH}x{HEIGHT}"
+                )
+                hat.off()
+                return
+            try:
+                run_animation(
+                    display,
+                    animation_name,
+                    None,
+                    duration if duration > 0 else float("inf"),
+                    recording=recording,
+                )
+            except KeyboardInterrupt:
+                print("Exiting demo...")
+            display.close()
+            hat.off()
+            return
+
         # Check if the animation exists
         if animation_name in ANIMATIONS:
             print(f"Running specific animation: {animation_name}")
@@ -106,21 +196,32 @@ def main():
                 if duration <= 0:  # Run indefinitely for zero or negative duration
                     while True:  # Indefinite loop
                         run_animation(
-                            animation_name, ANIMATIONS[animation_name], 60
+                            display,
+                            animation_name,
+                            ANIMATIONS[animation_name],
+                            60,
+                            cache,
                         )  # Update every minute
                 else:
                     # Run for the specified duration
-                    run_animation(animation_name, ANIMATIONS[animation_name], duration)
+                    run_animation(
+                        display,
+                        animation_name,
+                        ANIMATIONS[animation_name],
+                        duration,
+                        cache,
+                    )
             except KeyboardInterrupt:
                 print("Exiting demo...")
-                unicornhathd.off()
+                display.close()
+                hat.off()
         else:
             # Show available animations if the specified one wasn't found
             print(f"Animation '{animation_name}' not found.")
             print("Available animations:")
             for name in sorted(ANIMATIONS.keys()):
                 print(f"  - {name}")
-            unicornhathd.off()
+            hat.off()
     else:
         # Default behavior: cycle through all animations
         try:
@@ -128,10 +229,11 @@ def main():
                 anim_list = list(ANIMATIONS.items())
                 random.shuffle(anim_list)
                 for name, func in anim_list:
-                    run_animation(name, func, DURATION)
+                    run_animation(display, name, func, DURATION, cache)
         except KeyboardInterrupt:
             print("Exiting demo...")
-            unicornhathd.off()
+            display.close()
+            hat.off()
 
 
 if __name__ == "__main__":
@@ -1,18 +1,45 @@
 #!/usr/bin/env python3
 
-import time
+from utils.startup import StartupTimer, lazy_import
+
+# Created before the other imports so that --startup-time includes them
+startup = StartupTimer()
+
+import os
+import sys
 import math
 import random
-from datetime import datetime
-from PIL import Image
-import unicornhathd
-
-from utils.digits import DIGITS
-from utils.animations import ANIMATIONS
+import threading
+import time
+from collections import namedtuple
+from datetime import datetime, timedelta
+
+from config import (
+    HOUR_COLOR,
+    MINUTE_COLOR,
+    POSITIVE_COLOR,
+    NEGATIVE_COLOR,
+    GAMMA,
+    TARGET_FPS,
+)
+from utils.glyphs import GlyphAtlas
+from utils.compositor import Compositor
+from utils.registry import ANIMATIONS, ANIMATION_PALETTES, ANIMATION_PERIODS
+from utils.scheduler import next_minute, seconds_until
+from utils.frame_clock import FrameClock
+from utils.canvas import load_canvas, open_canvas_display
+from utils.backends import backend_from_argv
+
+# Only needed once the time is showing, so loaded on first use
+asyncio = lazy_import("asyncio")
+signal = lazy_import("signal")
+control = lazy_import("utils.control")
+profiling = lazy_import("utils.profiling")
+
+startup.mark("imports")
 
 # -- Clock Configuration --
-HOUR_COLOR = (255, 255, 255)
-MINUTE_COLOR = (255, 100, 0)
+# Colours and the frame rate are in config.py, shared with the other scripts
 BRIGHTNESS = 0.8
 ROTATION = 0
 FLIP_H = True
@@ -28,66 +55,179 @@ MAX_BRIGHTNESS = 0.8  # Maximum brightness level
 ANIMATION_TRIGGER_MINUTES = [0, 15, 30, 45]
 # How long the animation should run in seconds
 ANIMATION_DURATION = 30
-# Colors for the new animation rendering mode
-POSITIVE_COLOR = HOUR_COLOR
-NEGATIVE_COLOR = MINUTE_COLOR
-
-
-def draw_digit(image, digit, x_offset, y_offset, color):
-    """Draws a single 8x8 digit onto the Pillow image."""
-    digit_array = DIGITS.get(str(digit), DIGITS["0"])
-    for y, row in enumerate(digit_array):
-        for x, value in enumerate(row):
-            if value > 0:
-                pixel_color = (
-                    int(color[0] * value),
-                    int(color[1] * value),
-                    int(color[2] * value),
-                )
-                image.putpixel((x + x_offset, y + y_offset), pixel_color)
-
-
-def run_animation(duration, width, height):
-    """Selects and runs a random animation using the new float->color method."""
-    name, func = random.choice(list(ANIMATIONS.items()))
+# How the time gives way to an animation and back: "fade", "wipe" or None
+# for a hard cut, taking TRANSITION_DURATION seconds at each end
+TRANSITION = "fade"
+TRANSITION_DURATION = 1.0
+# Pre-render one cycle of periodic animations to disk and replay it
+FRAME_CACHE = True
+FRAME_CACHE_MAX_MB = 64
+# Directory of record.py recordings to play, e.g. "recordings" (None, the
+# default, computes every animation live). An animation with a recording at
+# the panel's size is played back from it instead of computed, looping, at
+# PLAYBACK_RATE times the recorded speed. Recordings keep the colours they
+# were rendered with and loop after their own length, so record at least
+# ANIMATION_DURATION seconds.
+RECORDINGS_DIR = None
+PLAYBACK_RATE = 1.0
+
+# -- Display Backend --
+# "unicornhathd" drives the real HAT, "headless" renders into memory.
+# Overridden by the UNICORN_BACKEND environment variable or --backend NAME.
+BACKEND = "unicornhathd"
+# Frames queued for the background display thread, so rendering overlaps
+# with the SPI transfer. 0 pushes every frame from the render loop instead.
+DISPLAY_LATENCY = 1
+# Panels tiling a larger canvas, e.g. two chained HATs side by side:
+#   [{"x": 0, "y": 0}, {"x": 16, "y": 0, "rotation": 180}]
+# Each dict takes x, y (the panel's top-left on the canvas), rotation,
+# flip_h, flip_v and optionally its own "backend", "width"/"height" (16 by
+# default) and "address" on the driver (by default its position among the
+# panels sharing the driver, see utils.canvas). None is the single panel
+# oriented by ROTATION, FLIP_H and FLIP_V.
+PANELS = None
+
+# -- Control Socket --
+# Unix domain socket for changing the running clock (see ClockService). A
+# relative path is placed in the runtime directory: systemd's
+# RuntimeDirectory= or $XDG_RUNTIME_DIR (see utils.control.socket_path).
+# Overridden by UNICORN_CONTROL_SOCKET, None disables it.
+CONTROL_SOCKET = "unicorn-pi.sock"
+
+# -- Profiling --
+# Per-stage render timings are always collected (see utils.profiling). A
+# JSON snapshot is printed to the journal on SIGUSR1 (kill -USR1 <pid>) and
+# every PROFILE_INTERVAL seconds (None for only on SIGUSR1), and written to
+# PROFILE_PATH as well if it is set.
+PROFILE_INTERVAL = None
+PROFILE_PATH = None
+
+# The canvas stands in for the driver, fanning brightness and off out to
+# every panel
+hat = load_canvas(
+    backend_from_argv(sys.argv, BACKEND), PANELS, ROTATION, FLIP_H, FLIP_V
+)
+startup.mark("backend")
+
+
+# An animation ready to run, see prepare_animation
+PreparedAnimation = namedtuple("PreparedAnimation", "name colors render")
+
+
+def prepare_animation(display, name, colors=None, cache=None, warm_up=True, stop=None):
+    """
+    Gets the named animation ready to run on display: opens its recording
+    or builds its renderer (rendering its cycle into the frame cache), and
+    with warm_up runs its simulation ahead, if it has one (see
+    AnimationRegistry.prepare). colors is the (positive, negative) pair for
+    two-tone animations. Setting the threading.Event stop cuts the cycle
+    rendering and the warm-up short.
+    """
+    # The render stack is loaded on first use, it is not needed to show the time
+    from utils.render import make_renderer
+    from utils.playback import Player, find_recording
+    from utils.geometry import get_geometry
+    from utils.palette import get_palette
+
+    colors = colors or (POSITIVE_COLOR, NEGATIVE_COLOR)
+    recording = None
+    if RECORDINGS_DIR:
+        recording = find_recording(RECORDINGS_DIR, name, display.width, display.height)
+    if recording is not None:
+        print(f"Using recording: {recording.path}")
+        render = Player(recording, rate=PLAYBACK_RATE).render
+    else:
+        geometry = get_geometry(display.width, display.height)
+        palette = get_palette(ANIMATION_PALETTES.get(name), *colors, GAMMA)
+        render = make_renderer(
+            name,
+            ANIMATIONS[name],
+            geometry,
+            palette,
+            ANIMATION_PERIODS.get(name),
+            TARGET_FPS,
+            cache,
+            # Recorded against the animation once it runs, so one prepared
+            # but never run does not show up in the profile
+            profiling.ACTIVE,
+            stop,
+        )
+        if warm_up:
+            ANIMATIONS.prepare(name, (display.height, display.width), stop)
+    return PreparedAnimation(name, colors, render)
+
+
+def run_animation(
+    display,
+    duration,
+    cache=None,
+    name=None,
+    colors=None,
+    clock=None,
+    stop=None,
+    compositor=None,
+    face=None,
+    prepared=None,
+):
+    """
+    Runs the named animation (a random one if name is None) using the
+    float->color method, until duration has passed or the stop event is set.
+    colors is the (positive, negative) pair for two-tone animations. Pass a
+    FrameClock as clock to read its stats while the animation is running.
+    With a Compositor and face, a function returning the clock face, the
+    animation transitions in from the face and back out to it. prepared
+    is a PreparedAnimation to run instead, without preparing it first.
+    """
+    if prepared is None:
+        if name is None:
+            name = random.choice(list(ANIMATIONS))
+        # Started cold, the simulation burn-in would only delay the first frame
+        prepared = prepare_animation(display, name, colors, cache, warm_up=False)
+    name, render = prepared.name, prepared.render
     print(f"Running animation: {name}")
-
-    start_time = time.time()
-
-    while time.time() - start_time < duration:
-        t = time.time() - start_time
-
-        for y_hat in range(height):
-            for x_hat in range(width):
-                i = y_hat * width + x_hat
-
-                # 1. Get float value from the animation function
-                value = func(t, i, x_hat, y_hat)
-
-                # 2. Clip the value to the range [-1.0, 1.0]
-                value = max(-1.0, min(1.0, value))
-
-                # 3. Determine color and brightness based on the value
-                r, g, b = 0, 0, 0
-                if value > 0:
-                    brightness = value
-                    r = int(POSITIVE_COLOR[0] * brightness)
-                    g = int(POSITIVE_COLOR[1] * brightness)
-                    b = int(POSITIVE_COLOR[2] * brightness)
-                elif value < 0:
-                    brightness = abs(value)
-                    r = int(NEGATIVE_COLOR[0] * brightness)
-                    g = int(NEGATIVE_COLOR[1] * brightness)
-                    b = int(NEGATIVE_COLOR[2] * brightness)
-
-                # Apply flipping for consistent orientation
-                x_disp = (width - 1) - x_hat if FLIP_H else x_hat
-                y_disp = (height - 1) - y_hat if FLIP_V else y_hat
-
-                unicornhathd.set_pixel(x_disp, y_disp, r, g, b)
-
-        unicornhathd.show()
-        time.sleep(1.0 / 60)  # Aim for 60fps
+    profile = profiling.begin(name)
+
+    clock = clock or FrameClock(TARGET_FPS)
+    clock.start()
+    skipped = display.skipped_frames
+    transition = TRANSITION_DURATION if compositor is not None else 0.0
+    face_in = face() if transition else None
+    face_out = None
+
+    while clock.elapsed() < duration and not (stop and stop.is_set()):
+        t = clock.elapsed()
+
+        # 1 & 2. Get the float frame from the animation function and map it to
+        # colours through the palette (or replay it from the frame cache or
+        # a recording)
+        rgb = render(t)
+
+        # Blend with the clock face while transitioning in or out, into the
+        # compositor's own buffers
+        if t < transition or duration - t < transition:
+            compositing = time.perf_counter()
+            if t < transition:
+                rgb = compositor.blend(face_in, rgb, t / transition)
+            else:
+                if face_out is None:
+                    face_out = face()  # The time may have moved on
+                rgb = compositor.blend(rgb, face_out, 1.0 - (duration - t) / transition)
+            profile.record("composite", time.perf_counter() - compositing)
+
+        # 3. Push the whole frame, orientation is handled by the display
+        pushing = time.perf_counter()
+        display.show(rgb)
+
+        # 4. Sleep for whatever is left of the frame budget
+        sleeping = time.perf_counter()
+        clock.tick()
+        profile.record("push", sleeping - pushing)
+        profile.record("sleep", time.perf_counter() - sleeping)
+
+    display.flush()
+    profiling.end()
+    skipped = display.skipped_frames - skipped
+    print(f"Finished animation: {name} ({clock.stats}, {skipped} unchanged skipped)")
 
 
 def update_auto_brightness(current_hour, current_minute):
@@ -116,68 +256,385 @@ def update_auto_brightness(current_hour, current_minute):
             sin_brightness * (MAX_BRIGHTNESS - MIN_BRIGHTNESS)
         )
 
-        unicornhathd.brightness(calculated_brightness)
+        hat.brightness(calculated_brightness)
         # print(f"Current brightness set to: {calculated_brightness:.2f} (Hour: {hour_float:.2f})") # Uncomment for debugging
     else:
         # If auto-brightness is off, ensure it uses the default BRIGHTNESS
-        unicornhathd.brightness(BRIGHTNESS)
+        hat.brightness(BRIGHTNESS)
 
 
-def main():
-    """Main function to run the clock."""
-    unicornhathd.rotation(ROTATION)
-    # Initial brightness set here, but it will be overridden by update_auto_brightness
-    unicornhathd.brightness(BRIGHTNESS)
-    width, height = unicornhathd.get_shape()
+async def _wait(event, deadline):
+    """Waits until the wall clock reaches deadline or event is set."""
+    try:
+        await asyncio.wait_for(event.wait(), seconds_until(deadline))
+    except asyncio.TimeoutError:
+        pass
 
-    last_minute = -1
-    last_hour = -1  # To trigger brightness update on hour change
 
-    print("Clock running. Press Ctrl+C to exit.")
+class ClockService:
+    """
+    Runs the clock as asyncio tasks: redrawing the time (stepping the
+    brightness first), firing the animation triggers and serving the
+    control socket. Animations render on a worker thread while they hold the
+    display, so the event loop stays responsive to commands throughout.
+    While the time is showing, the animation for the next trigger is picked
+    and prepared on the worker, so it starts warm.
+    """
 
-    try:
+    def __init__(self, display, cache=None):
+        self.display = display
+        self.cache = cache
+        self.colors = {
+            "hour": HOUR_COLOR,
+            "minute": MINUTE_COLOR,
+            "positive": POSITIVE_COLOR,
+            "negative": NEGATIVE_COLOR,
+        }
+        self.brightness = None  # None follows update_auto_brightness
+        self.glyphs = GlyphAtlas(
+            HOUR_COLOR, MINUTE_COLOR, display.width, display.height
+        )
+        self.animation = None  # Name of the running animation
+        self.next_animation = None  # Picked for the next trigger
+        self._preparing = None  # Task preparing next_animation
+        self._preparing_for = None  # Its (name, colors)
+        self._preparing_stop = None  # Event cutting its worker job short
+        self.clock = FrameClock(TARGET_FPS)
+        self.compositor = (
+            Compositor(display.width, display.height, TRANSITION)
+            if TRANSITION
+            else None
+        )
+        self.last_stats = {}  # Animation name -> stats of its last run
+        self._stop = threading.Event()
+        self._display_lock = asyncio.Lock()
+        # Held while the worker runs or prepares an animation, as both may
+        # use the same simulation
+        self._worker_lock = asyncio.Lock()
+        self._redraw = asyncio.Event()
+        self._requests = asyncio.Queue()
+        self.commands = {
+            "help": self.cmd_help,
+            "list": self.cmd_list,
+            "animate": self.cmd_animate,
+            "stop": self.cmd_stop,
+            "brightness": self.cmd_brightness,
+            "color": self.cmd_color,
+            "stats": self.cmd_stats,
+            "profile": self.cmd_profile,
+        }
+
+    # -- Tasks --
+
+    async def clock_task(self):
+        """
+        Steps the brightness and draws the time on every minute boundary
+        and on request.
+        """
         while True:
+            # Waits out a running animation, which sets _redraw when it ends
+            async with self._display_lock:
+                now = datetime.now()
+                # Before the frame goes out, so it shows at the new brightness
+                self.apply_brightness(now)
+                if self._redraw.is_set():
+                    # Brightness, colours or an animation changed the panel,
+                    # so push the time even if the frame itself is unchanged
+                    self.display.invalidate()
+                    self._redraw.clear()
+                self.display.show(self.glyphs.compose(now.strftime("%H%M")))
+            await _wait(self._redraw, next_minute(now))
+
+    async def trigger_task(self):
+        """Queues the next animation on each ANIMATION_TRIGGER_MINUTES minute."""
+        while True:
+            trigger = next_minute(datetime.now(), ANIMATION_TRIGGER_MINUTES)
+            if trigger is None:
+                return
+            if self._preparing is None:
+                self.prepare_next()
+            await asyncio.sleep(seconds_until(trigger))
+            # Sleeps are capped, so this may be short of the trigger, and the
+            # wall clock may have jumped (NTP, DST) either way meanwhile.
+            # Only fire within the trigger minute, otherwise start over from
+            # the time it is now.
             now = datetime.now()
-            current_hour = now.hour
-            current_minute = now.minute
-
-            # Only update brightness if the hour or minute has changed
-            if current_hour != last_hour or current_minute != last_minute:
-                update_auto_brightness(current_hour, current_minute)
-
-                # Check for animation trigger when the minute changes
-                if current_minute in ANIMATION_TRIGGER_MINUTES:
-                    run_animation(ANIMATION_DURATION, width, height)
-                    # After animation, fall through to redraw the clock immediately
-
-                # Draw the clock
-                time_str = now.strftime("%H%M")
-                image = Image.new("RGB", (width, height))
-
-                draw_digit(image, time_str[0], 0, 0, HOUR_COLOR)
-                draw_digit(image, time_str[1], 8, 0, HOUR_COLOR)
-                draw_digit(image, time_str[2], 0, 8, MINUTE_COLOR)
-                draw_digit(image, time_str[3], 8, 8, MINUTE_COLOR)
-
-                # Update the Unicorn HAT HD display
-                for y_img in range(height):
-                    for x_img in range(width):
-                        x_hat = (width - 1) - x_img if FLIP_H else x_img
-                        y_hat = (height - 1) - y_img if FLIP_V else y_img
-                        r, g, b = image.getpixel((x_img, y_img))
-                        unicornhathd.set_pixel(x_hat, y_hat, r, g, b)
-
-                unicornhathd.show()
-                last_minute = current_minute
-                last_hour = (
-                    current_hour  # Update last_hour here as well for brightness updates
+            if not trigger <= now < trigger + timedelta(minutes=1):
+                continue
+            if self.animation is None and self._requests.empty():
+                self._requests.put_nowait(self.next_animation)
+
+    async def animation_task(self):
+        """Runs queued animations one at a time on a worker thread."""
+        loop = asyncio.get_running_loop()
+        while True:
+            name = await self._requests.get()
+            name = name or self.next_animation or random.choice(list(ANIMATIONS))
+            colors = (self.colors["positive"], self.colors["negative"])
+            prepared = None
+            if name != self.next_animation:
+                # Don't wait for the worker to finish preparing another one
+                self.cancel_preparation()
+            # Taken over here, so a colour change meanwhile starts a new one
+            preparing, self._preparing = self._preparing, None
+            if preparing is not None:
+                try:
+                    prepared = await preparing
+                except Exception:
+                    pass  # Reported by _prepared, the animation starts cold
+                if prepared is not None and prepared.colors != colors:
+                    prepared = None  # Prepared before a colour change
+            async with self._worker_lock, self._display_lock:
+                self._stop.clear()
+                self.animation = name
+                try:
+                    await loop.run_in_executor(
+                        None,
+                        run_animation,
+                        self.display,
+                        ANIMATION_DURATION,
+                        self.cache,
+                        self.animation,
+                        colors,
+                        self.clock,
+                        self._stop,
+                        self.compositor,
+                        self.face,
+                        prepared,
+                    )
+                except Exception as e:
+                    # A broken animation (such as a user formula) is skipped,
+                    # the clock and the other tasks keep running
+                    profiling.end()
+                    print(f"Animation failed: {name}: {type(e).__name__}: {e}")
+                finally:
+                    self.last_stats[self.animation] = self.clock.stats
+                    self.animation = None
+            # After the animation, redraw the clock immediately and get the
+            # next one ready, as this one may have used its simulation
+            self._redraw.set()
+            self.prepare_next()
+
+    def prepare_next(self, name=None):
+        """
+        Picks the animation for the next trigger (name, or a random one) and
+        prepares it on the worker in the background.
+        """
+        name = name or random.choice(list(ANIMATIONS))
+        colors = (self.colors["positive"], self.colors["negative"])
+        self.next_animation = name
+        if self._preparing is not None:
+            if self._preparing_for == (name, colors):
+                return  # Already being prepared, or ready
+            self.cancel_preparation()
+        self._preparing_for = (name, colors)
+        self._preparing_stop = threading.Event()
+        self._preparing = asyncio.ensure_future(
+            self._prepare(name, colors, self._preparing_stop)
+        )
+        self._preparing.add_done_callback(self._prepared)
+
+    def cancel_preparation(self):
+        """Cancels the pending preparation, stopping its worker job early."""
+        if self._preparing is not None:
+            self._preparing_stop.set()
+            self._preparing.cancel()
+            self._preparing = None
+
+    async def _prepare(self, name, colors, stop):
+        async with self._worker_lock:
+            started = time.perf_counter()
+            job = asyncio.get_running_loop().run_in_executor(
+                None,
+                prepare_animation,
+                self.display,
+                name,
+                colors,
+                self.cache,
+                True,
+                stop,
+            )
+            try:
+                prepared = await asyncio.shield(job)
+            except asyncio.CancelledError:
+                # The worker cannot be interrupted, so keep it from running
+                # an animation until it has finished with the simulation
+                try:
+                    await job
+                except Exception:
+                    pass
+                raise
+            elapsed = time.perf_counter() - started
+        print(f"Prepared animation: {name} ({elapsed * 1000:.0f} ms)")
+        return prepared
+
+    @staticmethod
+    def _prepared(task):
+        if not task.cancelled() and task.exception() is not None:
+            error = task.exception()
+            print(f"Preparing animation failed: {type(error).__name__}: {error}")
+
+    async def profile_task(self):
+        """Dumps the profiling snapshot on SIGUSR1 and every PROFILE_INTERVAL."""
+        asyncio.get_running_loop().add_signal_handler(
+            signal.SIGUSR1, profiling.dump, PROFILE_PATH
+        )
+        while PROFILE_INTERVAL:
+            await asyncio.sleep(PROFILE_INTERVAL)
+            profiling.dump(PROFILE_PATH)
+
+    async def run(self, socket_path=None):
+        """Runs every task until cancelled."""
+        server = None
+        if socket_path:
+            try:
+                server = await control.serve_control(self.commands, socket_path)
+                print(f"Control socket listening on {socket_path}")
+            except OSError as e:
+                # The clock is still worth showing without the socket
+                print(f"Control socket unavailable at {socket_path}: {e}")
+        try:
+            await asyncio.gather(
+                self.clock_task(),
+                self.trigger_task(),
+                self.animation_task(),
+                self.profile_task(),
+            )
+        finally:
+            # Let a running animation finish its frame and return
+            self._stop.set()
+            self.cancel_preparation()
+            if server is not None:
+                server.close()
+                os.unlink(socket_path)
+
+    def face(self):
+        """The clock face for the current time."""
+        return self.glyphs.compose(datetime.now().strftime("%H%M"))
+
+    def apply_brightness(self, now):
+        if self.brightness is None:
+            update_auto_brightness(now.hour, now.minute)
+        else:
+            hat.brightness(self.brightness)
+
+    # -- Control commands, each taking the list of arguments --
+
+    def cmd_help(self, args):
+        """help: lists the commands."""
+        return " | ".join(cmd.__doc__.split(":")[0] for cmd in self.commands.values())
+
+    def cmd_list(self, args):
+        """list: the names of the animations."""
+        return list(ANIMATIONS)
+
+    def cmd_animate(self, args):
+        """animate [NAME]: starts the named (or the next) animation now."""
+        name = " ".join(args) or None
+        if name is not None and name not in ANIMATIONS:
+            raise control.CommandError(f"unknown animation '{name}', try 'list'")
+        # The request replaces the running animation and any queued one
+        while not self._requests.empty():
+            self._requests.get_nowait()
+        self._stop.set()
+        self._requests.put_nowait(name)
+        return name
+
+    def cmd_stop(self, args):
+        """stop: ends the running animation and shows the time."""
+        self._stop.set()
+
+    def cmd_brightness(self, args):
+        """brightness VALUE|auto: sets a fixed brightness or daylight tracking."""
+        if args == ["auto"]:
+            self.brightness = None
+        else:
+            try:
+                value = float(args[0]) if len(args) == 1 else -1.0
+            except ValueError:
+                value = -1.0
+            if not 0.0 <= value <= 1.0:
+                raise control.CommandError(
+                    "expected a brightness from 0.0 to 1.0 or 'auto'"
                 )
+            self.brightness = value
+        self.apply_brightness(datetime.now())
+        self._redraw.set()
+
+    def cmd_color(self, args):
+        """color hour|minute|positive|negative R G B: changes a colour."""
+        if not args or args[0] not in self.colors:
+            raise control.CommandError(f"expected one of {', '.join(self.colors)}")
+        self.colors[args[0]] = control.parse_color(args[1:])
+        if args[0] in ("hour", "minute"):
+            self.glyphs = GlyphAtlas(
+                self.colors["hour"],
+                self.colors["minute"],
+                self.display.width,
+                self.display.height,
+            )
+            self._redraw.set()
+        else:
+            # positive/negative take effect from the next animation
+            self.prepare_next(self.next_animation)
+
+    def cmd_stats(self, args):
+        """stats: live frame statistics as JSON."""
+        return {
+            "animation": self.animation,
+            "next": self.next_animation,
+            "live": self.clock.stats.as_dict() if self.animation else None,
+            "last": {name: stats.as_dict() for name, stats in self.last_stats.items()},
+            "shown_frames": self.display.shown_frames,
+            "skipped_frames": self.display.skipped_frames,
+            "brightness": "auto" if self.brightness is None else self.brightness,
+        }
+
+    def cmd_profile(self, args):
+        """profile: per-stage render timings as JSON."""
+        return profiling.snapshot()
+
 
-            time.sleep(1.0)
+def main():
+    """Main function to run the clock."""
+    # Show the time first, the rest of the service loads while it is up.
+    # Each panel's rotation and flips are folded into its display's buffer view
+    display = open_canvas_display(hat, DISPLAY_LATENCY)
+    now = datetime.now()
+    update_auto_brightness(now.hour, now.minute)
+    glyphs = GlyphAtlas(HOUR_COLOR, MINUTE_COLOR, display.width, display.height)
+    display.show(glyphs.compose(now.strftime("%H%M")))
+    display.flush()
+    startup.mark("first frame")
+
+    if "--startup-time" in sys.argv:
+        # Measurement mode: report the startup phases and leave the time up
+        print(startup.report())
+        display.close()
+        return
+    print(f"Time shown {startup.elapsed() * 1000:.0f} ms after start")
+
+    from utils.frame_cache import FrameCache
+    from utils.formula import load_formulas
+
+    # Formula animations from the user's file (see utils.formula)
+    ANIMATIONS.update(load_formulas())
+    cache = (
+        FrameCache(max_bytes=FRAME_CACHE_MAX_MB * 1024 * 1024) if FRAME_CACHE else None
+    )
+    service = ClockService(display, cache)
 
+    print("Clock running. Press Ctrl+C to exit.")
+
+    try:
+        socket_path = control.socket_path(CONTROL_SOCKET)
+        if socket_path is None and CONTROL_SOCKET:
+            print("Control socket disabled, no runtime directory to put it in")
+        asyncio.run(service.run(socket_path))
     except KeyboardInterrupt:
         print("Exiting...")
-        unicornhathd.off()
+        display.close()
+        hat.off()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Renders animations offline, as fast as possible, into frame recordings.
+
+Usage:
+  python record.py                              # All animations, 10 s each
+  python record.py -d 30 --fps 30 Plasma Spiral  # Only the named animations
+  python record.py -o previews --gif --png-strip -j 4
+
+Each animation is rendered in its own process from a pool, at simulated
+times n / fps, and written to <output>/<name>.rec in the utils.recording
+format, optionally with a GIF and a PNG contact sheet next to it. The
+per-frame render cost of each animation is reported as it finishes.
+"""
+
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+from config import POSITIVE_COLOR, NEGATIVE_COLOR, GAMMA, TARGET_FPS
+from utils.registry import ANIMATIONS, ANIMATION_PALETTES
+from utils.formula import load_formulas
+from utils.geometry import get_geometry
+from utils.palette import get_palette
+from utils.recording import (
+    RecordingWriter,
+    read_recording,
+    recording_path,
+    save_gif,
+    save_png_strip,
+)
+from utils.render import make_renderer
+
+
+def _init_worker():
+    # Formulas are compiled functions, so each worker loads them itself
+    ANIMATIONS.update(load_formulas())
+
+
+def record_animation(
+    name, path, duration, fps, width=16, height=16, gif=False, png_strip=False
+):
+    """
+    Renders duration seconds of one animation at fps into a recording at
+    path and returns a summary of the per-frame render times in ms.
+    """
+    geometry = get_geometry(width, height)
+    palette = get_palette(
+        ANIMATION_PALETTES.get(name), POSITIVE_COLOR, NEGATIVE_COLOR, GAMMA
+    )
+    ANIMATIONS.set_max_steps(name, (height, width), None)
+    render = make_renderer(name, ANIMATIONS[name], geometry, palette, fps=fps)
+    n_frames = max(1, int(round(duration * fps)))
+
+    times = np.empty(n_frames)
+    clock = time.perf_counter
+    with RecordingWriter(path, width, height, fps) as writer:
+        for n in range(n_frames):
+            start = clock()
+            rgb = render(n / fps)
+            times[n] = clock() - start
+            writer.write(rgb)
+
+    if gif or png_strip:
+        _, frames = read_recording(path)
+        base = os.path.splitext(path)[0]
+        if gif:
+            save_gif(base + ".gif", frames, fps)
+        if png_strip:
+            save_png_strip(base + ".png", frames)
+
+    times *= 1000
+    return {
+        "frames": n_frames,
+        "bytes": os.path.getsize(path),
+        "mean_ms": float(times.mean()),
+        "max_ms": float(times.max()),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Render animations offline into frame recordings."
+    )
+    parser.add_argument(
+        "animations", nargs="*", help="Animations to render (default all)"
+    )
+    parser.add_argument("-d", "--duration", type=float, default=10.0)
+    parser.add_argument("--fps", type=float, default=TARGET_FPS)
+    parser.add_argument("--width", type=int, default=16)
+    parser.add_argument("--height", type=int, default=16)
+    parser.add_argument("-o", "--output", default="recordings", help="Output directory")
+    parser.add_argument(
+        "-j", "--jobs", type=int, default=None, help="Worker processes (default: CPUs)"
+    )
+    parser.add_argument("--gif", action="store_true", help="Also export a GIF")
+    parser.add_argument(
+        "--png-strip", action="store_true", help="Also export a PNG contact sheet"
+    )
+    args = parser.parse_args(argv)
+
+    _init_worker()
+    names = args.animations or list(ANIMATIONS)
+    unknown = [name for name in names if name not in ANIMATIONS]
+    if unknown:
+        parser.error(f"unknown animations: {', '.join(unknown)}")
+    os.makedirs(args.output, exist_ok=True)
+
+    start = time.perf_counter()
+    failed = []
+    print(f"{'Animation':<30} {'frames':>7} {'mean':>8} {'max':>8}  (ms/frame)")
+    with ProcessPoolExecutor(args.jobs, initializer=_init_worker) as pool:
+        jobs = {
+            pool.submit(
+                record_animation,
+                name,
+                recording_path(args.output, name),
+                args.duration,
+                args.fps,
+                args.width,
+                args.height,
+                args.gif,
+                args.png_strip,
+            ): name
+            for name in names
+        }
+        for job in as_completed(jobs):
+            name = jobs[job]
+            try:
+                result = job.result()
+            except Exception as e:
+                failed.append(name)
+                print(f"{name:<30} failed: {e}")
+                continue
+            print(
+                f"{name:<30} {result['frames']:>7} {result['mean_ms']:>8.3f} "
+                f"{result['max_ms']:>8.3f}"
+            )
+
+    elapsed = time.perf_counter() - start
+    print(f"Rendered {len(names) - len(failed)} animation(s) in {elapsed:.1f} s")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
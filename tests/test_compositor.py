@@ -0,0 +1,37 @@
+import tracemalloc
+
+import numpy as np
+import pytest
+
+from utils.compositor import TRANSITIONS, Compositor
+
+FRAMES = 240
+
+
+def _idle(under, over, progress):
+    return None
+
+
+def _peak(blend, under, over):
+    """Peak bytes allocated while blending one whole transition."""
+    tracemalloc.reset_peak()
+    baseline = tracemalloc.get_traced_memory()[0]
+    for n in range(FRAMES + 1):
+        blend(under, over, n / FRAMES)
+    return tracemalloc.get_traced_memory()[1] - baseline
+
+
+@pytest.mark.parametrize("mode", TRANSITIONS)
+def test_blend_does_not_allocate(mode):
+    rng = np.random.default_rng(0)
+    under = rng.integers(0, 256, (16, 16, 3), dtype=np.uint8)
+    over = rng.integers(0, 256, (16, 16, 3), dtype=np.uint8)
+    compositor = Compositor(16, 16, mode)
+
+    tracemalloc.start()
+    try:
+        _peak(compositor.blend, under, over)  # Warm up NumPy's internal caches
+        allocated = _peak(compositor.blend, under, over) - _peak(_idle, under, over)
+    finally:
+        tracemalloc.stop()
+    assert allocated <= 0
@@ -0,0 +1,11 @@
+import importlib
+
+import pytest
+
+from utils.registry import BUILTIN_ANIMATIONS
+
+
+@pytest.mark.parametrize("module", sorted(set(BUILTIN_ANIMATIONS.values())))
+def test_builtin_animations_match_modules(module):
+    registered = {name for name, mod in BUILTIN_ANIMATIONS.items() if mod == module}
+    assert registered == set(importlib.import_module(module).ANIMATIONS)
@@ -0,0 +1,15 @@
+"""Small in-place NumPy helpers shared by the simulations."""
+
+import numpy as np
+
+
+def roll_into(src, shift, axis, out):
+    """Writes np.roll(src, shift, axis) into out without allocating (shift is +/-1)."""
+    src = np.moveaxis(src, axis, 0)
+    out = np.moveaxis(out, axis, 0)
+    if shift == 1:
+        out[1:] = src[:-1]
+        out[0] = src[-1]
+    else:
+        out[:-1] = src[1:]
+        out[-1] = src[0]
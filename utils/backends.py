@@ -0,0 +1,123 @@
+import atexit
+import os
+from collections import deque
+
+import numpy as np
+
+from utils.recording import save_png_strip
+
+# Environment variables selecting and configuring the backend
+BACKEND_ENV = "UNICORN_BACKEND"
+PNG_STRIP_ENV = "UNICORN_PNG_STRIP"
+
+BACKENDS = ("unicornhathd", "headless")
+
+
+class HeadlessBackend:
+    """
+    In-memory stand-in for the unicornhathd module.
+
+    Implements the subset of the driver API the clock uses (rotation,
+    brightness, get_shape, set_pixel, show, off, the [x][y] pixel buffer and
+    the multi-panel setup_buffer, enable_addressing and setup_display), so
+    utils.display.Display and the rest of the pipeline run unchanged on a
+    machine without the HAT. Every show() is counted and the whole buffer is
+    recorded as an (H, W, 3) uint8 array, keeping the last max_frames.
+    """
+
+    def __init__(self, width=16, height=16, max_frames=1024):
+        self.width = width
+        self.height = height
+        self._buf = np.zeros((width, height, 3), dtype=int)
+        self._rotation = 0
+        self._brightness = 0.5
+        self.addressing = False
+        self.displays = {}  # Address -> (x, y, rotation) of each panel
+        self.show_count = 0
+        self.frames = deque(maxlen=max_frames)
+
+    def setup_buffer(self, width, height):
+        self.width = width
+        self.height = height
+        self._buf = np.zeros((width, height, 3), dtype=int)
+
+    def enable_addressing(self, enabled=True):
+        self.addressing = enabled
+
+    def setup_display(self, address, x, y, rotation):
+        self.displays[address] = (x, y, rotation)
+
+    def rotation(self, r=0):
+        self._rotation = int(round(r / 90.0)) % 4
+
+    def get_rotation(self):
+        return self._rotation * 90
+
+    def brightness(self, b=0.5):
+        self._brightness = b
+
+    def get_brightness(self):
+        return self._brightness
+
+    def get_shape(self):
+        return self.width, self.height
+
+    def set_pixel(self, x, y, r, g, b):
+        self._buf[int(x)][int(y)] = r, g, b
+
+    def get_pixel(self, x, y):
+        return tuple(self._buf[int(x)][int(y)])
+
+    def set_all(self, r, g, b):
+        self._buf[:] = r, g, b
+
+    def clear(self):
+        self._buf.fill(0)
+
+    def show(self):
+        self.show_count += 1
+        frame = np.rot90(self._buf, self._rotation).transpose(1, 0, 2)
+        self.frames.append(frame.astype(np.uint8))
+
+    def off(self):
+        self.clear()
+        self.show()
+
+    def save_png_strip(self, path, frames=None, scale=4, columns=32):
+        """Saves the recorded frames as a PNG contact sheet."""
+        save_png_strip(path, self.frames if frames is None else frames, scale, columns)
+
+
+def backend_from_argv(argv, default="unicornhathd"):
+    """
+    Picks the backend name from a --backend NAME / --backend=NAME flag,
+    removing it from argv, then the UNICORN_BACKEND variable, then default.
+    """
+    for n, arg in enumerate(argv):
+        if arg == "--backend" and n + 1 < len(argv):
+            name = argv[n + 1]
+            del argv[n : n + 2]
+            return name
+        if arg.startswith("--backend="):
+            del argv[n]
+            return arg.split("=", 1)[1]
+    return os.environ.get(BACKEND_ENV, default)
+
+
+def load_backend(name="unicornhathd", width=16, height=16):
+    """
+    Returns the display backend called name (one of BACKENDS). width and
+    height size a headless backend, hardware reports its own shape.
+    """
+    if name == "headless":
+        backend = HeadlessBackend(width, height)
+        png_strip = os.environ.get(PNG_STRIP_ENV)
+        if png_strip:
+            # Dump whatever was recorded when the process exits
+            atexit.register(backend.save_png_strip, png_strip)
+        return backend
+    if name == "unicornhathd":
+        import unicornhathd
+
+        return unicornhathd
+    raise ValueError(f"Unknown display backend '{name}', expected one of {BACKENDS}")
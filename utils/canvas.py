@@ -0,0 +1,238 @@
+"""
+Virtual canvas of any size, tiled across one or more physical panels.
+
+Animations render whole frames at the canvas size. CanvasDisplay cuts each
+frame into the panels' regions and hands every region to that panel's own
+utils.display.Display, which folds in the panel's orientation, so tiling
+costs one slice per panel and no per-pixel work.
+
+Panels sharing a driver, such as several HATs chained on the unicornhathd
+driver, are driven with its multi-display support: the driver's buffer
+covers all of them, each panel's Display writes its own window of it and
+the driver sends every window to its panel's address on one show().
+"""
+
+from utils.backends import load_backend
+from utils.display import Display, PipelinedDisplay, open_display
+
+# The drivers turn each addressed panel's window a quarter turn further than
+# a lone panel's buffer. Panels are set up with this rotation to cancel that,
+# as their Display already folds in their orientation.
+ADDRESSED_ROTATION = -1
+
+
+class Panel:
+    """
+    A physical panel showing the canvas region whose top-left corner is at
+    (x, y). rotation, flip_h and flip_v orient it as in Display, and the
+    region is its physical shape (the driver's, unless given), swapped for
+    a rotation of 90 or 270. A panel sharing its driver with others is told
+    apart by its address on the driver (see Canvas).
+    """
+
+    def __init__(
+        self,
+        driver,
+        x=0,
+        y=0,
+        rotation=0,
+        flip_h=False,
+        flip_v=False,
+        shape=None,
+        address=None,
+    ):
+        self.driver = driver
+        self.x = x
+        self.y = y
+        self.rotation = rotation
+        self.flip_h = flip_h
+        self.flip_v = flip_v
+        self.address = address
+        self.physical_shape = tuple(shape or driver.get_shape())
+        width, height = self.physical_shape
+        if rotation % 180 == 90:
+            width, height = height, width
+        self.width = width
+        self.height = height
+
+    def open_display(self, latency=0):
+        if self.address is not None:
+            # Its window of the shared buffer, which is laid out as the canvas
+            return Display(
+                self.driver,
+                *self.physical_shape,
+                self.rotation,
+                self.flip_h,
+                self.flip_v,
+                self.x,
+                self.y,
+            )
+        return open_display(
+            self.driver,
+            *self.physical_shape,
+            self.rotation,
+            self.flip_h,
+            self.flip_v,
+            latency,
+        )
+
+
+class Canvas:
+    """
+    The panels making up the display. Provides the driver calls the clock
+    makes (get_shape, brightness, off) for the canvas as a whole, so it
+    can stand in for a single driver.
+
+    A driver shared by several panels has its buffer set up to cover them
+    at their canvas positions, with addressing enabled and each panel set
+    up at its address (by default its position among the driver's panels).
+    """
+
+    def __init__(self, panels):
+        self.panels = list(panels)
+        if not self.panels:
+            raise ValueError("A canvas needs at least one panel")
+        self.drivers = []
+        for panel in self.panels:
+            if not any(driver is panel.driver for driver in self.drivers):
+                self.drivers.append(panel.driver)
+        for driver in self.drivers:
+            shared = [panel for panel in self.panels if panel.driver is driver]
+            if len(shared) > 1:
+                self._setup_addressing(driver, shared)
+        self.width = max(panel.x + panel.width for panel in self.panels)
+        self.height = max(panel.y + panel.height for panel in self.panels)
+
+    @staticmethod
+    def _setup_addressing(driver, panels):
+        for n, panel in enumerate(panels):
+            if panel.address is None:
+                panel.address = n
+        addresses = [panel.address for panel in panels]
+        if len(set(addresses)) != len(addresses):
+            raise ValueError("Panels sharing a driver need their own address")
+        driver.setup_buffer(
+            max(panel.x + panel.physical_shape[0] for panel in panels),
+            max(panel.y + panel.physical_shape[1] for panel in panels),
+        )
+        driver.enable_addressing(True)
+        for panel in panels:
+            driver.setup_display(panel.address, panel.x, panel.y, ADDRESSED_ROTATION)
+
+    def get_shape(self):
+        return self.width, self.height
+
+    def brightness(self, b):
+        for driver in self.drivers:
+            driver.brightness(b)
+
+    def off(self):
+        for driver in self.drivers:
+            driver.off()
+
+
+class CanvasDisplay:
+    """
+    Shows canvas-sized (H, W, 3) frames across the panels. Each panel skips
+    a region identical to the one it already shows, and a driver is only
+    refreshed if one of its panels changed, so a change confined to one
+    panel's driver only refreshes that driver. Canvas pixels not covered
+    by any panel are ignored.
+    """
+
+    def __init__(self, canvas):
+        self.width, self.height = canvas.get_shape()
+        self.shown_frames = 0
+        self.skipped_frames = 0
+        # Each driver with the displays and canvas regions of its panels
+        self._drivers = [
+            (
+                driver,
+                [
+                    (
+                        panel.open_display(),
+                        (
+                            slice(panel.y, panel.y + panel.height),
+                            slice(panel.x, panel.x + panel.width),
+                        ),
+                    )
+                    for panel in canvas.panels
+                    if panel.driver is driver
+                ],
+            )
+            for driver in canvas.drivers
+        ]
+
+    def show(self, rgb=None):
+        """Shows each panel's region of rgb (or refreshes every panel)."""
+        shown = False
+        for driver, regions in self._drivers:
+            changed = rgb is None
+            for display, region in regions:
+                if rgb is not None and display.update(rgb[region]):
+                    changed = True
+            if changed:
+                driver.show()
+                shown = True
+        if shown:
+            self.shown_frames += 1
+        else:
+            self.skipped_frames += 1
+
+    def invalidate(self):
+        for _, regions in self._drivers:
+            for display, _ in regions:
+                display.invalidate()
+
+    def flush(self):
+        """Frames are shown synchronously, so there is nothing to wait for."""
+
+    def close(self):
+        """Nothing to stop for a synchronous display."""
+
+
+def load_canvas(backend, panels=None, rotation=0, flip_h=False, flip_v=False):
+    """
+    Builds the Canvas described by a PANELS list: one dict per panel with
+    its x, y, rotation, flip_h and flip_v, and optionally its own backend
+    name, width and height (16 by default) and address on the driver.
+    Panels naming the same backend share one driver. Without a list the
+    canvas is one `backend` panel oriented by rotation and the flips.
+    """
+    if not panels:
+        return Canvas([Panel(load_backend(backend), 0, 0, rotation, flip_h, flip_v)])
+    drivers = {}
+    for panel in panels:
+        name = panel.get("backend", backend)
+        if name not in drivers:
+            # Sized for a lone headless panel, set up again if shared
+            drivers[name] = load_backend(
+                name, panel.get("width", 16), panel.get("height", 16)
+            )
+    return Canvas(
+        Panel(
+            drivers[panel.get("backend", backend)],
+            panel.get("x", 0),
+            panel.get("y", 0),
+            panel.get("rotation", 0),
+            panel.get("flip_h", False),
+            panel.get("flip_v", False),
+            (panel.get("width", 16), panel.get("height", 16)),
+            panel.get("address"),
+        )
+        for panel in panels
+    )
+
+
+def open_canvas_display(canvas, latency=0):
+    """
+    Returns the display for the canvas, pipelined on a background thread
+    when latency is greater than 0 (see utils.display.open_display). A
+    single panel is driven directly, without the tiling layer.
+    """
+    if len(canvas.panels) == 1 and canvas.panels[0].x == canvas.panels[0].y == 0:
+        return canvas.panels[0].open_display(latency)
+    display = CanvasDisplay(canvas)
+    if latency > 0:
+        return PipelinedDisplay(display, latency)
+    return display
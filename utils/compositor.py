@@ -0,0 +1,80 @@
+"""
+Transitions between two layers, such as the clock face and an animation.
+
+All the work happens in buffers allocated once per display size, with
+in-place NumPy operations, so a transition allocates nothing per frame.
+Run `python -m utils.compositor` to check that with tracemalloc.
+"""
+
+import numpy as np
+
+TRANSITIONS = ("fade", "wipe")
+# Width in pixels of the soft edge of a wipe
+WIPE_EDGE = 4.0
+
+
+class Compositor:
+    """
+    Blends two (H, W, 3) uint8 layers into a preallocated frame.
+
+    "fade" cross-fades the whole frame. "wipe" sweeps a soft edge across
+    from left to right, with the new layer behind it.
+    """
+
+    def __init__(self, width, height, mode="fade", edge=WIPE_EDGE):
+        if mode not in TRANSITIONS:
+            raise ValueError(
+                f"Unknown transition '{mode}', expected one of {TRANSITIONS}"
+            )
+        self.width = width
+        self.height = height
+        self.mode = mode
+        self.edge = edge
+        shape = (height, width, 3)
+        self.frame = np.empty(shape, dtype=np.uint8)
+        self._under = np.empty(shape, dtype=np.float32)
+        self._over = np.empty(shape, dtype=np.float32)
+        # Wipe weights, full size as a broadcast multiply would need a buffer,
+        # and the column of every pixel in units of the edge width
+        self._weights = np.empty(shape, dtype=np.float32)
+        self._columns = np.empty(shape, dtype=np.float32)
+        self._columns[...] = (np.arange(width, dtype=np.float32) / edge)[:, None]
+        # Scalars as 0-d arrays, since NumPy converts Python floats into new
+        # arrays on every operation
+        self._weight = np.zeros((), dtype=np.float32)
+        self._zero = np.zeros((), dtype=np.float32)
+        self._one = np.ones((), dtype=np.float32)
+        self._half = np.full((), 0.5, dtype=np.float32)
+
+    def _wipe_weights(self, progress):
+        # 1 left of the edge, 0 right of it, ramping across `edge` columns
+        self._weight.fill(progress * (self.width + self.edge) / self.edge)
+        np.subtract(self._weight, self._columns, out=self._weights)
+        np.minimum(self._weights, self._one, out=self._weights)
+        np.maximum(self._weights, self._zero, out=self._weights)
+        return self._weights
+
+    def blend(self, under, over, progress):
+        """
+        Returns the frame `progress` (0 to 1) of the way from showing under
+        to showing over. The frame is reused between calls.
+        """
+        # Compared rather than min(max()), which allocates
+        if progress < 0.0:
+            progress = 0.0
+        elif progress > 1.0:
+            progress = 1.0
+        if self.mode == "wipe":
+            weight = self._wipe_weights(progress)
+        else:
+            self._weight.fill(progress)
+            weight = self._weight
+        # under + weight * (over - under), rounded back to uint8
+        np.copyto(self._under, under)
+        np.copyto(self._over, over)
+        self._over -= self._under
+        self._over *= weight
+        self._over += self._under
+        self._over += self._half
+        np.copyto(self.frame, self._over, casting="unsafe")
+        return self.frame
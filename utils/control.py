@@ -0,0 +1,115 @@
+"""
+Line protocol for controlling the running clock over a Unix domain socket.
+
+Every request is one line: a command name followed by space separated
+arguments. Every reply is one line: "ok", optionally followed by a result
+(JSON for anything structured), or "error" followed by a message.
+
+    $ echo "animate Plasma" | nc -U /run/unicorn-pi/unicorn-pi.sock
+    ok Plasma
+
+A relative socket path is placed in the service's runtime directory, which
+only its user can write to (see socket_path).
+"""
+
+import asyncio
+import json
+import os
+
+# Socket path, overridable with UNICORN_CONTROL_SOCKET
+CONTROL_SOCKET_ENV = "UNICORN_CONTROL_SOCKET"
+# Runtime directories, in order of preference: the one systemd creates for
+# RuntimeDirectory=, then the login session's
+RUNTIME_DIR_ENVS = ("RUNTIME_DIRECTORY", "XDG_RUNTIME_DIR")
+MAX_LINE = 4096
+
+
+class CommandError(ValueError):
+    """Raised by command handlers for a bad request, reported to the client."""
+
+
+def socket_path(path):
+    """
+    Resolves the socket path to listen on: UNICORN_CONTROL_SOCKET if set,
+    else path, with a relative path placed in the runtime directory.
+    Returns None if the socket is disabled (path is None) or there is no
+    runtime directory for a relative path.
+    """
+    path = os.environ.get(CONTROL_SOCKET_ENV, path)
+    if not path or os.path.isabs(path):
+        return path or None
+    for env in RUNTIME_DIR_ENVS:
+        directory = os.environ.get(env)
+        if directory:
+            # RuntimeDirectory= may list several, separated by colons
+            return os.path.join(directory.split(":")[0], path)
+    return None
+
+
+def parse_color(args):
+    """Parses "R G B" or "#rrggbb" arguments into an (r, g, b) tuple."""
+    try:
+        if len(args) == 1 and args[0].startswith("#") and len(args[0]) == 7:
+            value = int(args[0][1:], 16)
+            return (value >> 16, (value >> 8) & 0xFF, value & 0xFF)
+        if len(args) == 3:
+            color = tuple(int(channel) for channel in args)
+            if all(0 <= channel <= 255 for channel in color):
+                return color
+    except ValueError:
+        pass
+    raise CommandError("expected a colour as 'R G B' (0-255) or '#rrggbb'")
+
+
+def format_reply(result):
+    """Formats a handler's return value as an "ok" reply line."""
+    if result is None:
+        return "ok"
+    if isinstance(result, str):
+        return f"ok {result}"
+    return f"ok {json.dumps(result)}"
+
+
+def dispatch(commands, line):
+    """Runs one request line against commands (name -> handler(args))."""
+    words = line.split()
+    if not words:
+        return "error empty command"
+    handler = commands.get(words[0].lower())
+    if handler is None:
+        return f"error unknown command '{words[0]}', try 'help'"
+    try:
+        return format_reply(handler(words[1:]))
+    except CommandError as e:
+        return f"error {e}"
+
+
+async def _serve_client(commands, reader, writer):
+    try:
+        while True:
+            line = await reader.readline()
+            if not line:
+                break
+            reply = dispatch(commands, line.decode(errors="replace"))
+            writer.write(reply.encode() + b"\n")
+            await writer.drain()
+    except (ConnectionError, ValueError):  # Reset, or a line over MAX_LINE
+        pass
+    finally:
+        writer.close()
+
+
+async def serve_control(commands, path):
+    """
+    Starts serving commands on a Unix domain socket at path, replacing a
+    stale socket left by a previous run. Only the owner may connect.
+    Returns the asyncio server; handlers run on the event loop. Raises
+    OSError if the socket cannot be bound.
+    """
+
+    def handle(reader, writer):
+        return _serve_client(commands, reader, writer)
+
+    server = await asyncio.start_unix_server(handle, path, limit=MAX_LINE)
+    os.chmod(path, 0o600)
+    return server
@@ -1,4 +1,4 @@
-# (The DIGITS dictionary and draw_digit function are unchanged)
+# 8x8 digit bitmaps, pre-rendered into colour tiles by utils.glyphs
 DIGITS = {
     "0": [
         [0.0, 1.0, 1.0, 1.0, 1.0, 1.0, 0.0, 0.0],
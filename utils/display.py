@@ -0,0 +1,193 @@
+import queue
+import threading
+
+import numpy as np
+
+
+class Display:
+    """
+    Pushes whole (H, W, 3) uint8 frames to a Unicorn HAT HD style driver.
+
+    The driver keeps its pixels in a buffer indexed [x][y] and rotates it with
+    numpy.rot90 when showing. Flips and rotation are folded into a view of that
+    buffer once, here, so a frame indexed [y, x] is written with a single
+    assignment and the driver's own rotation is left at 0.
+
+    Frames identical to the last one shown are skipped entirely, so static
+    periods (a settled simulation, the clock face) cost no SPI traffic.
+
+    x and y place the frame in a driver buffer shared by several panels
+    (see utils.canvas), at that offset rather than at the buffer's corner.
+    """
+
+    def __init__(
+        self,
+        driver,
+        width,
+        height,
+        rotation=0,
+        flip_h=False,
+        flip_v=False,
+        x=0,
+        y=0,
+    ):
+        self.driver = driver
+        self.x = x
+        self.y = y
+        self.shown_frames = 0
+        self.skipped_frames = 0
+        driver.rotation(0)
+
+        buffer = getattr(driver, "_buf", None)
+        if buffer is None:
+            # Driver without an accessible buffer, stage frames ourselves
+            # and hand them over with set_pixel
+            self._staging = np.zeros((width, height, 3), dtype=np.uint8)
+            buffer = self._staging
+        else:
+            self._staging = None
+            buffer = buffer[x : x + width, y : y + height]
+
+        # Undo the rotation the driver would have applied, then the flips,
+        # then swap [x][y] to [y, x] to match the frame layout
+        view = np.rot90(buffer, -(int(round(rotation / 90.0)) % 4), axes=(0, 1))
+        if flip_h:
+            view = view[::-1, :]
+        if flip_v:
+            view = view[:, ::-1]
+        self._view = view.transpose(1, 0, 2)
+        # Frame shape, width and height swap for a rotation of 90 or 270
+        self.height, self.width = self._view.shape[:2]
+        self._last = np.zeros(self._view.shape, dtype=np.uint8)
+        self._last_valid = False
+
+    def push(self, rgb):
+        """Writes an (H, W, 3) frame into the driver's buffer without showing it."""
+        self._view[...] = rgb
+        if self._staging is not None:
+            for x in range(self._staging.shape[0]):
+                for y in range(self._staging.shape[1]):
+                    r, g, b = self._staging[x, y].tolist()
+                    self.driver.set_pixel(self.x + x, self.y + y, r, g, b)
+
+    def update(self, rgb):
+        """
+        Pushes rgb unless it is identical to the frame already pushed, and
+        returns whether it did. The display is not refreshed (see show).
+        """
+        if self._last_valid and np.array_equal(rgb, self._last):
+            return False
+        self._last[...] = rgb
+        self._last_valid = True
+        self.push(rgb)
+        return True
+
+    def show(self, rgb=None):
+        """
+        Pushes rgb (if given) and refreshes the physical display, unless rgb
+        is identical to the frame already on it.
+        """
+        if rgb is not None and not self.update(rgb):
+            self.skipped_frames += 1
+            return
+        self.shown_frames += 1
+        self.driver.show()
+
+    def invalidate(self):
+        """Forces the next frame to be shown, e.g. after a brightness change."""
+        self._last_valid = False
+
+    def flush(self):
+        """Frames are shown synchronously, so there is nothing to wait for."""
+
+    def close(self):
+        """Nothing to stop for a synchronous display."""
+
+
+class PipelinedDisplay:
+    """
+    Double-buffered output stage that pushes frames on a background thread.
+
+    show() copies the frame into a free back buffer and queues it, so the
+    render loop can start on the next frame while the display thread is
+    still pushing the previous one over SPI. At most `latency` frames wait
+    in the queue; beyond that show() blocks until the display catches up.
+    """
+
+    def __init__(self, display, latency=1):
+        self.display = display
+        self.width = display.width
+        self.height = display.height
+        self._queue = queue.Queue(maxsize=latency)
+        # Queued frames, plus the one being pushed and the one being filled
+        self._free = queue.Queue()
+        for _ in range(latency + 2):
+            self._free.put(np.zeros((self.height, self.width, 3), dtype=np.uint8))
+        self._error = None
+        self._thread = threading.Thread(target=self._run, name="display", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while True:
+            buffer = self._queue.get()
+            try:
+                if buffer is None:
+                    return
+                self.display.show(buffer)
+            except Exception as e:  # Re-raised from the render thread
+                self._error = e
+            finally:
+                # Only recycle our own back buffers, not queued read-only frames
+                if buffer is not None and buffer.flags.writeable:
+                    self._free.put(buffer)
+                self._queue.task_done()
+
+    def show(self, rgb):
+        """
+        Queues an (H, W, 3) frame to be pushed and shown. Read-only frames,
+        such as memory mapped recordings and cached cycles, cannot change
+        while they wait, so they are queued as they are instead of copied.
+        """
+        if self._error is not None:
+            error, self._error = self._error, None
+            raise error
+        if not rgb.flags.writeable:
+            self._queue.put(rgb)
+            return
+        buffer = self._free.get()
+        buffer[...] = rgb
+        self._queue.put(buffer)
+
+    def flush(self):
+        """Blocks until every queued frame has been shown."""
+        self._queue.join()
+
+    def invalidate(self):
+        """Forces the next frame to be shown, e.g. after a brightness change."""
+        self.display.invalidate()
+
+    @property
+    def shown_frames(self):
+        return self.display.shown_frames
+
+    @property
+    def skipped_frames(self):
+        return self.display.skipped_frames
+
+    def close(self):
+        """Shows the remaining frames and stops the display thread."""
+        self._queue.put(None)
+        self._thread.join()
+
+
+def open_display(
+    driver, width, height, rotation=0, flip_h=False, flip_v=False, latency=0
+):
+    """
+    Returns a Display for the driver, pipelined on a background thread when
+    latency (the number of frames allowed to queue) is greater than 0.
+    """
+    display = Display(driver, width, height, rotation, flip_h, flip_v)
+    if latency > 0:
+        return PipelinedDisplay(display, latency)
+    return display
@@ -0,0 +1,229 @@
+"""
+Compiles tixy.land style formula strings into whole-frame animations.
+
+A formula is a single Python expression over t, i, x and y using the same
+maths as utils.animations, e.g. "sin(y / 8 + t) * cos(x / 8)". The display
+size w, h and centre cx, cy are available too, so a formula can size itself
+to the canvas rather than assume the 16x16 HAT. It is parsed
+and validated against a small whitelist, every subexpression that does not
+depend on t is hoisted out and computed once per display shape, and what is
+left is compiled into a NumPy kernel evaluated once per frame.
+"""
+
+import ast
+import os
+
+import numpy as np
+
+from utils.geometry import geometry_for
+
+# User formulas loaded at startup, one "Name: expression" per line
+FORMULAS_ENV = "UNICORN_FORMULAS"
+DEFAULT_FORMULAS_PATH = os.path.join("~", ".config", "unicorn-pi", "formulas.txt")
+
+VARIABLES = ("t", "i", "x", "y")
+# Time-invariant names taken from the display's Geometry
+SHAPE_NAMES = ("w", "h", "cx", "cy")
+
+FUNCTIONS = {
+    "sin": np.sin,
+    "cos": np.cos,
+    "tan": np.tan,
+    "atan2": np.arctan2,
+    "sqrt": np.sqrt,
+    "hypot": np.hypot,
+    "exp": np.exp,
+    "abs": np.abs,
+}
+# Arguments each function takes. NumPy would read an extra one as the
+# ufunc's output array.
+ARITY = {
+    "sin": 1,
+    "cos": 1,
+    "tan": 1,
+    "atan2": 2,
+    "sqrt": 1,
+    "hypot": 2,
+    "exp": 1,
+    "abs": 1,
+}
+
+CONSTANTS = {"pi": np.pi}
+
+_BINARY_OPS = (ast.Add, ast.Sub, ast.Mult, ast.Div, ast.FloorDiv, ast.Mod, ast.Pow)
+_UNARY_OPS = (ast.UAdd, ast.USub)
+_COMPARE_OPS = (ast.Lt, ast.LtE, ast.Gt, ast.GtE, ast.Eq, ast.NotEq)
+
+
+class FormulaError(ValueError):
+    """Raised for formulas that do not parse or use anything not allowed."""
+
+
+def _validate(node, source):
+    """Checks that the expression only uses whitelisted syntax and names."""
+    if isinstance(node, ast.Expression):
+        return _validate(node.body, source)
+    if isinstance(node, ast.Constant):
+        if isinstance(node.value, bool) or not isinstance(node.value, (int, float)):
+            raise FormulaError(f"Only numeric constants are allowed in '{source}'")
+    elif isinstance(node, ast.Name):
+        if node.id not in VARIABLES + SHAPE_NAMES and node.id not in CONSTANTS:
+            raise FormulaError(f"Unknown name '{node.id}' in '{source}'")
+    elif isinstance(node, ast.BinOp) and isinstance(node.op, _BINARY_OPS):
+        _validate(node.left, source)
+        _validate(node.right, source)
+    elif isinstance(node, ast.UnaryOp) and isinstance(node.op, _UNARY_OPS):
+        _validate(node.operand, source)
+    elif isinstance(node, ast.Compare):
+        if len(node.ops) != 1 or not isinstance(node.ops[0], _COMPARE_OPS):
+            raise FormulaError(f"Only single comparisons are allowed in '{source}'")
+        _validate(node.left, source)
+        _validate(node.comparators[0], source)
+    elif isinstance(node, ast.IfExp):
+        for child in (node.test, node.body, node.orelse):
+            _validate(child, source)
+    elif isinstance(node, ast.Call):
+        if not isinstance(node.func, ast.Name) or node.func.id not in FUNCTIONS:
+            raise FormulaError(f"Unknown function in '{source}'")
+        if node.keywords:
+            raise FormulaError(f"Keyword arguments are not allowed in '{source}'")
+        arity = ARITY[node.func.id]
+        if len(node.args) != arity:
+            raise FormulaError(
+                f"{node.func.id}() takes {arity} argument{'s' * (arity > 1)}, "
+                f"got {len(node.args)} in '{source}'"
+            )
+        for arg in node.args:
+            _validate(arg, source)
+    else:
+        raise FormulaError(f"Unsupported syntax '{type(node).__name__}' in '{source}'")
+
+
+def _uses_time(node):
+    return any(
+        isinstance(child, ast.Name) and child.id == "t" for child in ast.walk(node)
+    )
+
+
+class _Vectorizer(ast.NodeTransformer):
+    """Rewrites `a if test else b` as where(test, a, b) so it works on frames."""
+
+    def visit_IfExp(self, node):
+        node = self.generic_visit(node)
+        call = ast.Call(
+            func=ast.Name(id="where", ctx=ast.Load()),
+            args=[node.test, node.body, node.orelse],
+            keywords=[],
+        )
+        return ast.copy_location(call, node)
+
+
+class _Hoister(ast.NodeTransformer):
+    """
+    Replaces every maximal time-invariant subexpression with a name _h<n>,
+    collecting the subexpressions so they can be precomputed.
+    """
+
+    def __init__(self):
+        self.hoisted = []
+
+    def visit(self, node):
+        trivial = isinstance(node, (ast.Name, ast.Constant))
+        if isinstance(node, ast.expr) and not trivial and not _uses_time(node):
+            name = f"_h{len(self.hoisted)}"
+            self.hoisted.append(node)
+            return ast.copy_location(ast.Name(id=name, ctx=ast.Load()), node)
+        return self.generic_visit(node)
+
+
+def _lambda(args, body):
+    """Compiles `lambda *args: body` into a function over the formula namespace."""
+    tree = ast.Expression(
+        body=ast.Lambda(
+            args=ast.arguments(
+                posonlyargs=[],
+                args=[ast.arg(arg=name) for name in args],
+                kwonlyargs=[],
+                kw_defaults=[],
+                defaults=[],
+            ),
+            body=body,
+        )
+    )
+    ast.fix_missing_locations(tree)
+    namespace = dict(FUNCTIONS, where=np.where, **CONSTANTS)
+    return eval(compile(tree, "<formula>", "eval"), namespace)
+
+
+def compile_formula(source):
+    """
+    Compiles a formula string into an animation function (t, i, x, y) that
+    returns the whole frame, raising FormulaError if it is not valid.
+    """
+    try:
+        tree = ast.parse(source.strip(), mode="eval")
+    except SyntaxError as e:
+        raise FormulaError(f"Could not parse '{source}': {e.msg}") from None
+    _validate(tree, source)
+
+    hoister = _Hoister()
+    body = hoister.visit(_Vectorizer().visit(tree)).body
+    # Time-invariant parts, evaluated together once per display shape
+    invariant = _lambda(
+        ("i", "x", "y") + SHAPE_NAMES,
+        ast.Tuple(elts=hoister.hoisted, ctx=ast.Load()),
+    )
+    kernel = _lambda(
+        VARIABLES + SHAPE_NAMES + tuple(f"_h{n}" for n in range(len(hoister.hoisted))),
+        body,
+    )
+
+    def shape(geometry):
+        return geometry.width, geometry.height, geometry.cx, geometry.cy
+
+    def build(geometry):
+        with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+            return invariant(geometry.i, geometry.x, geometry.y, *shape(geometry))
+
+    key = ("formula", source)
+
+    def animation(t, i, x, y):
+        geometry = geometry_for(x)
+        hoisted = geometry.cached(key, build)
+        return kernel(t, i, x, y, *shape(geometry), *hoisted)
+
+    animation.source = source
+    animation.vectorized = True  # Never evaluated pixel by pixel
+    return animation
+
+
+def load_formulas(path=None):
+    """
+    Reads "Name: expression" lines (blank lines and # comments ignored) and
+    returns a dict of compiled animations. Invalid lines are reported and
+    skipped rather than stopping the clock. A missing file gives {}.
+    The path defaults to UNICORN_FORMULAS or DEFAULT_FORMULAS_PATH.
+    """
+    path = os.path.expanduser(
+        path or os.environ.get(FORMULAS_ENV, DEFAULT_FORMULAS_PATH)
+    )
+    formulas = {}
+    try:
+        with open(path) as f:
+            lines = f.readlines()
+    except FileNotFoundError:
+        return formulas
+
+    for number, line in enumerate(lines, 1):
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        name, sep, source = line.partition(":")
+        if not sep or not name.strip() or not source.strip():
+            print(f"{path}:{number}: expected 'Name: expression'")
+            continue
+        try:
+            formulas[name.strip()] = compile_formula(source)
+        except FormulaError as e:
+            print(f"{path}:{number}: {e}")
+    return formulas
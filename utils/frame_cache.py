@@ -0,0 +1,130 @@
+import hashlib
+import os
+import re
+
+import numpy as np
+
+# Where rendered cycles are stored, overridable with UNICORN_CACHE_DIR
+CACHE_DIR_ENV = "UNICORN_CACHE_DIR"
+DEFAULT_CACHE_DIR = os.path.join("~", ".cache", "unicorn-pi", "frames")
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+FILE_SUFFIX = ".frames"
+# Part of every cache key. Bump it when a change outside the animation's own
+# function alters its frames (utils.geometry, utils.render or the helpers an
+# animation calls), since cache_key() cannot see those
+CACHE_VERSION = 1
+
+
+def _code_fingerprint(code, digest):
+    """Feeds a code object into digest, ignoring memory addresses."""
+    digest.update(code.co_code)
+    for const in code.co_consts:
+        if hasattr(const, "co_code"):
+            _code_fingerprint(const, digest)
+        else:
+            digest.update(repr(const).encode())
+    digest.update(repr(code.co_names).encode())
+
+
+def cache_key(name, func, palette, shape, n_frames):
+    """
+    Returns the file key for one rendered cycle. It changes with the
+    animation function's own code, the palette lookup table, the display
+    shape, the number of frames in the cycle and CACHE_VERSION. Changes to
+    code the function calls are not detected, see CACHE_VERSION.
+    """
+    digest = hashlib.sha1()
+    digest.update(repr(CACHE_VERSION).encode())
+    func = getattr(func, "__wrapped__", func)
+    if hasattr(func, "__code__"):
+        _code_fingerprint(func.__code__, digest)
+    # Compiled formulas share one wrapper, tell them apart by their source
+    digest.update(getattr(func, "source", "").encode())
+    digest.update(palette.lut.tobytes())
+    digest.update(repr((tuple(shape), n_frames)).encode())
+    slug = re.sub(r"[^a-z0-9]+", "-", name.lower()).strip("-")
+    return f"{slug}-{digest.hexdigest()[:16]}"
+
+
+class FrameCache:
+    """
+    Disk cache of pre-rendered animation cycles.
+
+    Each cycle is a raw (N, H, W, 3) uint8 file that is memory mapped for
+    replay. The directory is kept under max_bytes by evicting the least
+    recently used cycles, tracked through the files' modification times.
+    """
+
+    def __init__(self, directory=None, max_bytes=DEFAULT_MAX_BYTES):
+        directory = directory or os.environ.get(CACHE_DIR_ENV, DEFAULT_CACHE_DIR)
+        self.directory = os.path.expanduser(directory)
+        self.max_bytes = max_bytes
+        os.makedirs(self.directory, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.directory, key + FILE_SUFFIX)
+
+    def load(self, key, n_frames, height, width):
+        """Returns the memory mapped cycle for key, or None if not cached."""
+        path = self._path(key)
+        shape = (n_frames, height, width, 3)
+        try:
+            if os.path.getsize(path) != np.prod(shape):
+                return None
+            frames = np.memmap(path, dtype=np.uint8, mode="r", shape=shape)
+            os.utime(path)  # Mark as recently used
+        except OSError:
+            return None
+        return frames
+
+    def store(self, key, frames):
+        """Writes a rendered cycle, evicting old ones to stay under max_bytes."""
+        self.evict(self.max_bytes - frames.nbytes)
+        path = self._path(key)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        frames.tofile(tmp_path)
+        os.replace(tmp_path, path)  # Never leave a half written cycle
+
+    def evict(self, max_bytes=None):
+        """Deletes least recently used cycles until the total fits max_bytes."""
+        max_bytes = self.max_bytes if max_bytes is None else max_bytes
+        entries = []
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith(FILE_SUFFIX):
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= max_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+
+    def cycle(self, name, func, geometry, palette, period, fps, stop=None):
+        """
+        Returns one period of the animation as (N, H, W, 3) uint8 frames,
+        rendering and storing it first if it is not cached yet. N is the
+        period at fps rounded to whole frames, and frame k is rendered at
+        t = k * period / N so the cycle loops without a seam. Returns None
+        if the threading.Event stop is set before the cycle is rendered.
+        """
+        n_frames = max(1, int(round(period * fps)))
+        shape = (geometry.height, geometry.width)
+        key = cache_key(name, func, palette, shape, n_frames)
+        frames = self.load(key, n_frames, *shape)
+        if frames is not None:
+            return frames
+
+        frames = np.empty((n_frames,) + shape + (3,), dtype=np.uint8)
+        for k in range(n_frames):
+            if stop is not None and stop.is_set():
+                return None
+            field = func(k * period / n_frames, geometry.i, geometry.x, geometry.y)
+            palette.map(field, out=frames[k])
+        if frames.nbytes <= self.max_bytes:
+            self.store(key, frames)
+        return frames
@@ -0,0 +1,103 @@
+import math
+import time
+
+
+class FrameStats:
+    """Running pacing statistics for one animation run."""
+
+    def __init__(self, target_fps):
+        self.target_fps = target_fps
+        self.frames = 0
+        self.late_frames = 0
+        self.dropped_frames = 0
+        self.elapsed = 0.0
+        # Welford running mean/variance of frame intervals (seconds)
+        self._mean = 0.0
+        self._m2 = 0.0
+
+    def record(self, interval):
+        self.frames += 1
+        self.elapsed += interval
+        delta = interval - self._mean
+        self._mean += delta / self.frames
+        self._m2 += delta * (interval - self._mean)
+
+    @property
+    def fps(self):
+        """Achieved frames per second."""
+        return self.frames / self.elapsed if self.elapsed > 0 else 0.0
+
+    @property
+    def frame_time(self):
+        """Mean frame interval in seconds."""
+        return self._mean
+
+    @property
+    def jitter(self):
+        """Standard deviation of the frame interval in seconds."""
+        return math.sqrt(self._m2 / self.frames) if self.frames > 1 else 0.0
+
+    def as_dict(self):
+        return {
+            "target_fps": self.target_fps,
+            "fps": round(self.fps, 2),
+            "frames": self.frames,
+            "late_frames": self.late_frames,
+            "dropped_frames": self.dropped_frames,
+            "frame_time_ms": round(self.frame_time * 1000, 3),
+            "jitter_ms": round(self.jitter * 1000, 3),
+        }
+
+    def __str__(self):
+        return (
+            f"{self.fps:.1f}/{self.target_fps} fps, {self.frames} frames, "
+            f"{self.late_frames} late, {self.dropped_frames} dropped, "
+            f"jitter {self.jitter * 1000:.2f} ms"
+        )
+
+
+class FrameClock:
+    """
+    Paces a render loop against absolute deadlines.
+
+    Call tick() once per frame after it has been pushed. It sleeps only for
+    what is left of the frame budget, so render time is not added on top of
+    the period. When a frame overruns by one or more whole periods, those
+    frames are dropped and the schedule moves on instead of trying to catch
+    up with a burst.
+    """
+
+    def __init__(self, fps=60, clock=time.monotonic, sleep=time.sleep):
+        self.period = 1.0 / fps
+        self._clock = clock
+        self._sleep = sleep
+        self.stats = FrameStats(fps)
+        self.start()
+
+    def start(self):
+        """(Re)starts the schedule and the statistics from now."""
+        self._start = self._clock()
+        self._deadline = self._start
+        self._last_frame = self._start
+        self.stats = FrameStats(self.stats.target_fps)
+
+    def elapsed(self):
+        """Seconds since start(), the t passed to the animations."""
+        return self._clock() - self._start
+
+    def tick(self):
+        """Waits for the next frame deadline and records the frame."""
+        self._deadline += self.period
+        remaining = self._deadline - self._clock()
+        if remaining > 0:
+            self._sleep(remaining)
+        else:
+            self.stats.late_frames += 1
+            missed = int(-remaining // self.period)
+            if missed:
+                self.stats.dropped_frames += missed
+                self._deadline += missed * self.period
+
+        now = self._clock()
+        self.stats.record(now - self._last_frame)
+        self._last_frame = now
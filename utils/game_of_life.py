@@ -1,58 +1,339 @@
 import numpy as np
 
-# 16x16 grid
-WIDTH = 16
-HEIGHT = 16
+from utils.arrays import roll_into
+from utils.simulation import Simulation, SimulationSlot
+from utils.stepping import lerp_into
 
-# Initialize the grid randomly
-_grid = np.random.choice([0, 1], size=(HEIGHT, WIDTH))
-_last_update = -1
+WORD_BITS = 64  # Cells per word of a PackedLife world
 
 
-def _step_life():
-    global _grid
-    neighbors = sum(
-        np.roll(np.roll(_grid, i, 0), j, 1)
-        for i in (-1, 0, 1)
-        for j in (-1, 0, 1)
-        if (i != 0 or j != 0)
-    )
-    _grid = ((neighbors == 3) | ((neighbors == 2) & (_grid == 1))).astype(int)
+class GameOfLife(Simulation):
+    def __init__(
+        self,
+        width=16,
+        height=16,
+        step_rate=5.0,  # Generations per second
+        max_steps=4,  # Most generations caught up in one frame
+        interpolate=False,  # Blend between the last two generations
+    ):
+        super().__init__(width, height, step_rate, max_steps)
+        self.interpolate = interpolate
+        self._blend = np.empty((height, width), dtype=np.float64)
+        self.reset()
 
+    def _count_neighbors(self):
+        """Counts the live neighbors of every cell, with wrap-around edges."""
+        grid = self._grid
+        self._neighbors = sum(
+            np.roll(np.roll(grid, i, 0), j, 1)
+            for i in (-1, 0, 1)
+            for j in (-1, 0, 1)
+            if (i != 0 or j != 0)
+        )
 
-def get_life_value(t, i, x, y):
+    def _update_field(self):
+        """
+        Rebuilds the output frame for the current generation: 1.0 for alive,
+        0.0 for dead and -1.0 for 'low life' (dead cell with 1 neighbor).
+        """
+        field = np.where(self._neighbors == 1, -1.0, 0.0)
+        field[self._grid == 1] = 1.0
+        field.flags.writeable = False
+        self._field = field
+
+    def _step(self):
+        neighbors, grid = self._neighbors, self._grid
+        self._grid = ((neighbors == 3) | ((neighbors == 2) & (grid == 1))).astype(int)
+        self._count_neighbors()
+        self._prev_field = self._field
+        self._update_field()
+
+    def get_frame(self, t):
+        """
+        Returns the whole grid as floats (see _update_field). The frame is
+        only rebuilt once per generation and served from cache in between,
+        or blended between the last two generations if interpolate is set.
+        t: time in seconds (float)
+        """
+        self._advance(t)
+        if self.interpolate:
+            return lerp_into(
+                self._prev_field, self._field, self._clock.alpha, self._blend
+            )
+        return self._field
+
+    def reset(self):
+        """Reset the grid to a new random configuration."""
+        self._grid = np.random.choice([0, 1], size=(self.height, self.width))
+        self._clock.reset()
+        self._count_neighbors()
+        self._update_field()
+        self._prev_field = self._field
+
+    def _warmed_up(self):
+        self._prev_field = self._field
+
+
+class PackedLife(Simulation):
     """
-    Returns 1.0 for alive, 0.0 for dead, -1.0 for 'low life' (cell with 1 neighbor).
-    t: time in seconds (float)
-    i: pixel index (unused)
-    x, y: pixel coordinates
+    Game of Life on a toroidal world much larger than the display, seen
+    through a width x height viewport that scrolls across it.
+
+    The world is bit-packed, 64 cells to a uint64 word (cell x of a row is
+    bit x % 64 of word x // 64), and each generation counts the neighbors
+    of all 64 cells of a word at once with bitwise full adders, in buffers
+    allocated up front. Frames are as GameOfLife's: 1.0 for alive, 0.0 for
+    dead and -1.0 for 'low life', but only the viewport is unpacked.
     """
-    global _last_update
-    # Update every 0.2 seconds
-    step_time = 0.2
-    step = int(t // step_time)
-    if step != _last_update:
-        _step_life()
-        _last_update = step
-    xi, yi = int(x) % WIDTH, int(y) % HEIGHT
-    alive = _grid[yi, xi]
-    # Count neighbors for this cell
-    neighbors = sum(
-        _grid[(yi + dy) % HEIGHT, (xi + dx) % WIDTH]
-        for dy in (-1, 0, 1)
-        for dx in (-1, 0, 1)
-        if not (dx == 0 and dy == 0)
-    )
-    if alive:
-        return 1.0
-    elif neighbors == 1:
-        return -1.0
-    else:
-        return 0.0
-
-
-def reset_grid():
-    global _grid, _last_update
-    _grid = np.random.choice([0, 1], size=(HEIGHT, WIDTH))
-    _last_update = -1
+
+    def __init__(
+        self,
+        width=16,
+        height=16,
+        world_width=256,  # A multiple of WORD_BITS
+        world_height=256,
+        scroll=(1.0, 0.5),  # Viewport speed in cells per second (x, y)
+        step_rate=5.0,  # Generations per second
+        max_steps=4,  # Most generations caught up in one frame
+        interpolate=False,  # Blend between the last two generations
+        seed=None,
+    ):
+        if world_width % WORD_BITS or world_width <= 0 or world_height <= 0:
+            raise ValueError(
+                f"World width must be a positive multiple of {WORD_BITS}, "
+                f"got {world_width}x{world_height}"
+            )
+        super().__init__(width, height, step_rate, max_steps)
+        self.world_width = world_width
+        self.world_height = world_height
+        self.scroll = scroll
+        self.interpolate = interpolate
+        self._rng = np.random.default_rng(seed)
+
+        # World bit planes: this generation, the next one (written by the
+        # neighbor count) and the previous one, kept with its low life to
+        # interpolate from
+        shape = (world_height, world_width // WORD_BITS)
+        self._world, self._next, self._previous = (
+            np.empty(shape, dtype=np.uint64) for _ in range(3)
+        )
+        self._lonely, self._prev_lonely = (
+            np.empty(shape, dtype=np.uint64) for _ in range(2)
+        )
+        # Work planes for the neighbor count
+        (
+            self._left,
+            self._right,
+            self._sum0,
+            self._sum1,
+            self._pair0,
+            self._pair1,
+            self._above0,
+            self._above1,
+            self._below0,
+            self._below1,
+        ) = (np.empty(shape, dtype=np.uint64) for _ in range(10))
+        self._one = np.uint64(1)
+        self._last_bit = np.uint64(WORD_BITS - 1)
+
+        # Viewport cells: index of each cell's word in the flattened world,
+        # and its bit in the word, for the current scroll position
+        view = (height, width)
+        self._index = np.empty(view, dtype=np.intp)
+        self._bits = np.empty(view, dtype=np.uint64)
+        self._cells = np.empty(view, dtype=np.uint64)
+        self._field = np.empty(view, dtype=np.float64)
+        self._prev_field = np.empty(view, dtype=np.float64)
+        self._blend = np.empty(view, dtype=np.float64)
+        self._position = None
+        self._shown = None  # (position, generation) of the frame in _field
+        self.reset()
+
+    def _count_neighbors(self):
+        """
+        Writes the next generation of the world into self._next, and the
+        current generation's low life (dead with 1 neighbor) into
+        self._lonely, from bitwise sums of the 8 neighbor planes.
+        """
+        world, left, right = self._world, self._left, self._right
+        # The west (x - 1) and east (x + 1) neighbor of every cell, carrying
+        # the edge bits across words and around the torus
+        roll_into(world, 1, 1, left)
+        np.right_shift(left, self._last_bit, out=left)
+        np.left_shift(world, self._one, out=self._sum0)
+        left |= self._sum0
+        roll_into(world, -1, 1, right)
+        np.left_shift(right, self._last_bit, out=right)
+        np.right_shift(world, self._one, out=self._sum0)
+        right |= self._sum0
+
+        # Per row: west + east as 2-bit (pair1, pair0), and west + cell +
+        # east as (sum1, sum0), for the rows above and below
+        pair0, pair1, sum0, sum1 = self._pair0, self._pair1, self._sum0, self._sum1
+        np.bitwise_xor(left, right, out=pair0)
+        np.bitwise_and(left, right, out=pair1)
+        np.bitwise_xor(pair0, world, out=sum0)
+        np.bitwise_and(pair0, world, out=sum1)
+        sum1 |= pair1
+        above0, above1 = self._above0, self._above1
+        below0, below1 = self._below0, self._below1
+        roll_into(sum0, 1, 0, above0)
+        roll_into(sum1, 1, 0, above1)
+        roll_into(sum0, -1, 0, below0)
+        roll_into(sum1, -1, 0, below1)
+
+        # Ones: above0 + below0 + pair0 = ones + 2 * carry
+        ones, carry = left, right  # Reused, the shifts are no longer needed
+        np.bitwise_xor(above0, below0, out=ones)
+        np.bitwise_and(above0, below0, out=carry)
+        np.bitwise_and(ones, pair0, out=sum0)
+        carry |= sum0
+        ones ^= pair0
+        # Twos: above1, below1, pair1 and carry, each worth 2. The count is
+        # 2 or 3 exactly when one of them is set, and 1 when none are
+        np.bitwise_xor(above1, below1, out=sum0)
+        np.bitwise_xor(pair1, carry, out=sum1)
+        np.bitwise_and(sum0, sum1, out=below0)  # Two set, one in each pair
+        sum0 ^= sum1  # An odd number set
+        np.bitwise_and(above1, below1, out=above0)  # Two or more set
+        np.bitwise_and(pair1, carry, out=sum1)
+        above0 |= sum1
+        above0 |= below0
+        np.bitwise_not(above0, out=above0)
+        sum0 &= above0  # Exactly one set
+        # Alive next with 3 neighbors, or 2 if alive now
+        np.bitwise_or(ones, world, out=self._next)
+        self._next &= sum0
+        # Low life: dead with a single neighbor
+        above1 |= below1
+        above1 |= pair1
+        above1 |= carry
+        np.bitwise_or(above1, world, out=above1)
+        np.bitwise_not(above1, out=above1)
+        np.bitwise_and(ones, above1, out=self._lonely)
+
+    def _step(self):
+        # Rotate the planes, the oldest one receives the next generation
+        self._previous, self._world, self._next = (
+            self._world,
+            self._next,
+            self._previous,
+        )
+        self._lonely, self._prev_lonely = self._prev_lonely, self._lonely
+        self._count_neighbors()
+        self.generation += 1
+
+    def _move_viewport(self, t):
+        """Points the viewport lookup at the scroll position for time t."""
+        x = int(self._origin[0] + self.scroll[0] * t) % self.world_width
+        y = int(self._origin[1] + self.scroll[1] * t) % self.world_height
+        if (x, y) == self._position:
+            return
+        self._position = (x, y)
+        columns = (x + np.arange(self.width)) % self.world_width
+        rows = (y + np.arange(self.height)) % self.world_height
+        words = self.world_width // WORD_BITS
+        self._index[...] = rows[:, None] * words + columns // WORD_BITS
+        self._bits[...] = columns % WORD_BITS
+
+    def _unpack(self, plane, out):
+        """Writes the viewport's cells of a bit plane into out as 0 or 1."""
+        np.take(plane.ravel(), self._index, out=self._cells)
+        np.right_shift(self._cells, self._bits, out=self._cells)
+        self._cells &= self._one
+        np.copyto(out, self._cells)
+
+    def _update_field(self, field, world, lonely):
+        """Builds the viewport frame of one generation, see GameOfLife."""
+        self._unpack(world, field)
+        self._unpack(lonely, self._blend)
+        field -= self._blend
+
+    def get_frame(self, t):
+        """
+        Returns the viewport as floats (see GameOfLife._update_field). The
+        array is reused, and only rebuilt when the generation or the scroll
+        position changes.
+        t: time in seconds (float)
+        """
+        self._advance(t)
+        self._move_viewport(t)
+        shown = (self._position, self.generation)
+        if shown != self._shown:
+            self._shown = shown
+            self._update_field(self._field, self._world, self._lonely)
+            if self.interpolate:
+                self._update_field(self._prev_field, self._previous, self._prev_lonely)
+        if self.interpolate:
+            return lerp_into(
+                self._prev_field, self._field, self._clock.alpha, self._blend
+            )
+        return self._field
+
+    def reset(self):
+        """Fills the world with a new random soup and moves the viewport."""
+        self._world[...] = self._rng.integers(
+            0,
+            np.iinfo(np.uint64).max,
+            self._world.shape,
+            dtype=np.uint64,
+            endpoint=True,
+        )
+        self._origin = (
+            self._rng.integers(self.world_width),
+            self._rng.integers(self.world_height),
+        )
+        self._position = None
+        self._shown = None
+        self.generation = 0
+        self._clock.reset()
+        self._count_neighbors()
+        # Nothing before the first generation, show it as its own previous
+        self._previous[...] = self._world
+        self._prev_lonely[...] = self._lonely
+
+
+# Simulated seconds run by prepare() before the animation starts
+BURN_IN_TIME = 2.0
+
+# The animation showing a viewport onto a large PackedLife world, which is
+# at least WORLD_WIDTH x WORLD_HEIGHT cells and grown to fit the viewport
+WORLD_ANIMATION = "Game of Life (Big World)"
+WORLD_WIDTH = 256  # A multiple of WORD_BITS
+WORLD_HEIGHT = 256
+# Generations of the packed world are cheap, so it is run further ahead
+WORLD_BURN_IN_TIME = 20.0
+
+
+def _build_world(width, height, max_steps):
+    world_width = max(WORLD_WIDTH, -(-width // WORD_BITS) * WORD_BITS)
+    world_height = max(WORLD_HEIGHT, height)
+    return PackedLife(width, height, world_width, world_height, max_steps=max_steps)
+
+
+def _start(life, name):
+    life.reset()
+
+
+_life = SimulationSlot(
+    lambda width, height, max_steps: GameOfLife(width, height, max_steps=max_steps),
+    _start,
+    BURN_IN_TIME,
+)
+_world = SimulationSlot(_build_world, _start, WORLD_BURN_IN_TIME)
+
+
+def get_life_value(t, i, x, y, world=False):
+    return (_world if world else _life).get().get_value(t, i, x, y)
+
+
+def reset_grid(shape=None, world=False):
+    (_world if world else _life).get(shape).reset()
     return True
+
+
+# Simulation behind each animation, prepared through utils.registry
+SIMULATIONS = {"Game of Life": _life, WORLD_ANIMATION: _world}
+
+# Animation entries, looked up by name through utils.registry
+ANIMATIONS = {name: slot.animation(name) for name, slot in SIMULATIONS.items()}
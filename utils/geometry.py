@@ -0,0 +1,92 @@
+from functools import lru_cache
+
+import numpy as np
+
+from utils.render import make_grids
+
+
+class Geometry:
+    """
+    Time-invariant per-pixel fields for one display shape.
+
+    Built once and shared by every animation rendering at that shape, so the
+    radius/angle math the formulas rely on is not recomputed every frame.
+    All fields have shape (height, width) and are indexed [y, x].
+    """
+
+    def __init__(self, width, height):
+        self.width = width
+        self.height = height
+        # As floats, so formulas such as x ** -1 work (NumPy refuses negative
+        # powers of integers) and every frame is computed in float64
+        self.i, self.x, self.y = (
+            grid.astype(np.float64) for grid in make_grids(width, height)
+        )
+        # Centre of the display (7.5, 7.5 on the 16x16 HAT)
+        self.cx = (width - 1) / 2
+        self.cy = (height - 1) / 2
+        self.dx = self.x - self.cx
+        self.dy = self.y - self.cy
+        self.r2 = self.dx**2 + self.dy**2
+        self.r = np.sqrt(self.r2)
+        self.theta = np.arctan2(self.dy, self.dx)
+        self._cache = {}
+        for field in (
+            self.i,
+            self.x,
+            self.y,
+            self.dx,
+            self.dy,
+            self.r2,
+            self.r,
+            self.theta,
+        ):
+            field.flags.writeable = False
+
+    def cached(self, key, build):
+        """
+        Returns build(self), computing it only the first time key is requested.
+        Use this for any other time-invariant field an animation needs.
+        """
+        try:
+            return self._cache[key]
+        except KeyError:
+            field = build(self)
+            for array in field if isinstance(field, tuple) else (field,):
+                if isinstance(array, np.ndarray):
+                    array.flags.writeable = False
+            self._cache[key] = field
+            return field
+
+    def distance(self, px, py):
+        """Distance of every pixel from the point (px, py)."""
+        return self.cached(
+            ("distance", px, py),
+            lambda g: np.hypot(g.x - px, g.y - py),
+        )
+
+    def design(self, size=16):
+        """
+        The x and y grids rescaled so the display spans `size` pixels, for
+        formulas laid out in pixels of the 16x16 HAT.
+        """
+        return self.cached(
+            ("design", size),
+            lambda g: (g.x * size / g.width, g.y * size / g.height),
+        )
+
+    def gaussian(self, k):
+        """Gaussian envelope exp(-k * r^2) around the display centre."""
+        return self.cached(("gaussian", k), lambda g: np.exp(-k * g.r2))
+
+
+@lru_cache(maxsize=None)
+def get_geometry(width, height):
+    """Returns the shared Geometry for frames of width x height pixels."""
+    return Geometry(width, height)
+
+
+def geometry_for(grid):
+    """Returns the shared Geometry matching a (height, width) frame grid."""
+    height, width = grid.shape
+    return get_geometry(width, height)
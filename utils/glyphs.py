@@ -0,0 +1,58 @@
+import numpy as np
+
+from utils.digits import DIGITS
+
+GLYPH_SIZE = 8
+
+
+class GlyphAtlas:
+    """
+    The DIGITS tables pre-rendered as coloured uint8 tiles.
+
+    Tiles are built once per colour, so drawing the time is four slice
+    assignments into a preallocated frame with no per-pixel work.
+    """
+
+    def __init__(self, hour_color, minute_color, width=16, height=16):
+        # (10, 8, 8) intensities, indexed by digit
+        intensities = np.array([DIGITS[str(d)] for d in range(10)], dtype=np.float64)
+        intensities = intensities[..., np.newaxis]
+        self.hour_tiles = self._tiles(intensities, hour_color)
+        self.minute_tiles = self._tiles(intensities, minute_color)
+        self.frame = np.zeros((height, width, 3), dtype=np.uint8)
+        face = 2 * GLYPH_SIZE
+        self._face = np.zeros((face, face, 3), dtype=np.uint8)
+        # The 16x16 clock face is centred on the display, and cropped to its
+        # middle on displays smaller than the face
+        self.x = max(0, (width - face) // 2)
+        self.y = max(0, (height - face) // 2)
+        crop_x = max(0, (face - width) // 2)
+        crop_y = max(0, (face - height) // 2)
+        self._crop = (
+            slice(crop_y, crop_y + min(face, height)),
+            slice(crop_x, crop_x + min(face, width)),
+        )
+        self._region = (
+            slice(self.y, self.y + min(face, height)),
+            slice(self.x, self.x + min(face, width)),
+        )
+
+    @staticmethod
+    def _tiles(intensities, color):
+        # Truncate like int(color * value) did when drawing pixel by pixel
+        return (intensities * np.array(color, dtype=np.float64)).astype(np.uint8)
+
+    def compose(self, time_str):
+        """
+        Draws an "HHMM" string, hours on the top row and minutes below, and
+        returns the (H, W, 3) frame. The frame is reused between calls.
+        """
+        s = GLYPH_SIZE
+        digits = [int(c) if c.isdigit() else 0 for c in time_str]
+        face = self._face
+        face[0:s, 0:s] = self.hour_tiles[digits[0]]
+        face[0:s, s : 2 * s] = self.hour_tiles[digits[1]]
+        face[s : 2 * s, 0:s] = self.minute_tiles[digits[2]]
+        face[s : 2 * s, s : 2 * s] = self.minute_tiles[digits[3]]
+        self.frame[self._region] = face[self._crop]
+        return self.frame
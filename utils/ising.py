@@ -1,7 +1,20 @@
 import numpy as np
 
+from utils.arrays import roll_into
+from utils.simulation import Simulation, SimulationSlot
+from utils.stepping import lerp_into
 
-class IsingModel:
+ALGORITHMS = ("heatbath", "metropolis", "wolff")
+
+
+def _check_algorithm(algorithm):
+    if algorithm not in ALGORITHMS:
+        raise ValueError(
+            f"Unknown Ising algorithm '{algorithm}', expected one of {ALGORITHMS}"
+        )
+
+
+class IsingModel(Simulation):
     def __init__(
         self,
         width=16,
@@ -12,9 +25,13 @@ class IsingModel:
         annealing_rate=0.05,
         min_temperature=0.5,
         temporal_window=4,  # Number of grids to average for smoothing
+        algorithm="heatbath",  # One of ALGORITHMS
+        seed=None,
+        step_rate=60.0,  # Lattice updates per second
+        max_steps=4,  # Most updates caught up in one frame
+        interpolate=False,  # Blend between the last two averaged grids
     ):
-        self.width = width
-        self.height = height
+        super().__init__(width, height, step_rate, max_steps)
         self.j = J
         self.h = H
         self.initial_temperature = initial_temperature
@@ -22,76 +39,195 @@ class IsingModel:
         self.annealing_rate = annealing_rate
         self.min_temperature = min_temperature
         self.temporal_window = temporal_window
-        self._grid = np.random.choice([-1, 1], size=(self.height, self.width))
-        self._last_update = -1
-        self._history = np.empty(
-            (self.temporal_window, self.height, self.width), dtype=np.float32
+        _check_algorithm(algorithm)
+        self.algorithm = algorithm
+        self.interpolate = interpolate
+        self._rng = np.random.default_rng(seed)
+
+        shape = (self.height, self.width)
+        # Checkerboard masks for the red-black updates, built once
+        parity = np.indices(shape).sum(axis=0) % 2
+        self._parity_masks = (parity == 0, parity == 1)
+
+        # Preallocated work buffers, updated in place every step
+        self._grid = np.empty(shape, dtype=np.int8)
+        self._shifted = np.empty(shape, dtype=np.int8)
+        self._spins = np.empty(shape, dtype=np.int8)
+        self._neighbors = np.empty(shape, dtype=np.float64)
+        self._prob = np.empty(shape, dtype=np.float64)
+        self._rand = np.empty(shape, dtype=np.float64)
+        self._accept = np.empty(shape, dtype=bool)
+        self._bonds = (np.empty(shape, dtype=bool), np.empty(shape, dtype=bool))
+        self._cluster = np.empty(shape, dtype=bool)
+        self._grown = np.empty(shape, dtype=bool)
+        self._shifted_mask = np.empty(shape, dtype=bool)
+        self._history = np.empty((self.temporal_window,) + shape, dtype=np.float32)
+        self._history_sum = np.empty(shape, dtype=np.float32)
+        self._avg_grid = np.empty(shape, dtype=np.float32)
+        self._prev_avg_grid = np.empty(shape, dtype=np.float32)
+        self._blend = np.empty(shape, dtype=np.float32)
+        self._reset_state()
+
+    def _reset_state(self):
+        self._grid[...] = self._rng.choice(
+            np.array([-1, 1], dtype=np.int8), size=self._grid.shape
         )
+        self._clock.reset()
+        self._steps_run = 0
         self._history[0] = self._grid
         self._history_ptr = 1  # Next index to write
         self._history_filled = 1  # Number of valid grids
-        self._history_sum = self._grid.astype(np.float32).copy()  # Running sum for mean
+        self._history_sum[...] = self._grid  # Running sum for mean
+        self._avg_grid[...] = self._grid
+        self._prev_avg_grid[...] = self._grid
+
+    def _neighbor_sum(self):
+        """Sums the 4 neighbors of every spin into self._neighbors (periodic)."""
+        grid, shifted, neighbors = self._grid, self._shifted, self._neighbors
+        neighbors.fill(0.0)
+        for axis in (0, 1):
+            for shift in (1, -1):
+                roll_into(grid, shift, axis, shifted)
+                neighbors += shifted
 
     def _heatbath_step(self):
         """
         Vectorized red-black (checkerboard) heatbath update for the Ising model using numpy.
         This preserves asynchronous-like dynamics and avoids checkerboard artifacts.
         """
-        grid = self._grid
-        for parity in [0, 1]:
-            # Calculate neighbor sum with periodic boundary conditions
-            neighbors_sum = (
-                np.roll(grid, 1, axis=0)  # North
-                + np.roll(grid, -1, axis=0)  # South
-                + np.roll(grid, 1, axis=1)  # West
-                + np.roll(grid, -1, axis=1)  # East
-            )
-            delta_E = 2 * self.j * neighbors_sum
+        prob, rand, up = self._prob, self._rand, self._accept
+        for mask in self._parity_masks:
+            self._neighbor_sum()
+            # P(up) = 1 / (1 + exp(-2 (J * neighbors + H) / T))
+            np.multiply(self._neighbors, -2 * self.j / self.temperature, out=prob)
             if self.h != 0:
-                delta_E += 2 * self.h
-            flip_prob = 1 / (1 + np.exp(-delta_E / self.temperature))
-            rand_vals = np.random.rand(self.height, self.width)
-            # Create checkerboard mask for current parity
-            mask = np.indices((self.height, self.width)).sum(axis=0) % 2 == parity
+                prob -= 2 * self.h / self.temperature
+            np.exp(prob, out=prob)
+            prob += 1.0
+            np.reciprocal(prob, out=prob)
+            self._rng.random(out=rand)
+            np.less(rand, prob, out=up)
             # Only update spins at the current parity
-            update = np.where(rand_vals < flip_prob, 1, -1)
-            grid = np.where(mask, update, grid)
-        self._grid = grid
+            np.multiply(up, 2, out=self._spins, casting="unsafe")
+            self._spins -= 1
+            np.copyto(self._grid, self._spins, where=mask)
 
-    def get_ising_value(self, t, i, x, y):
+    def _metropolis_step(self):
         """
-        Returns a value between -1.0 and 1.0 representing the spin at position (x, y).
-        t: time in seconds (float)
-        i: pixel index (unused)
-        x, y: pixel coordinates
+        Red-black Metropolis update: each spin of the current parity flips
+        with probability min(1, exp(-dE / T)), dE = 2 s (J * neighbors + H).
         """
-        if t != self._last_update:
-            self._heatbath_step()
+        prob, rand, flip = self._prob, self._rand, self._accept
+        for mask in self._parity_masks:
+            self._neighbor_sum()
+            np.multiply(self._neighbors, self.j, out=prob)
+            if self.h != 0:
+                prob += self.h
+            prob *= self._grid
+            prob *= -2 / self.temperature
+            np.exp(prob, out=prob)
+            self._rng.random(out=rand)
+            np.less(rand, prob, out=flip)
+            flip &= mask
+            np.negative(self._grid, out=self._grid, where=flip)
+
+    def _wolff_step(self):
+        """
+        Flips one Wolff cluster grown from a random seed spin. Bonds between
+        equal neighbors are activated with p = 1 - exp(-2J / T) and the
+        cluster is flood filled along them with whole-lattice operations.
+        The external field H is ignored by this update rule.
+
+        When the cluster covers more than half the lattice the remaining
+        spins are flipped instead. With H ignored the model is symmetric
+        under a global flip, so this is the same move, but an ordered lattice
+        no longer strobes between all up and all down every step.
+        """
+        grid, shifted, rand = self._grid, self._shifted, self._rand
+        cluster, grown, step = self._cluster, self._grown, self._accept
+        shifted_mask = self._shifted_mask
+        p_add = 1.0 - np.exp(-2 * self.j / self.temperature)
+
+        # bonds[axis][y, x] links (y, x) to its +1 neighbor along axis
+        for axis, bonds in enumerate(self._bonds):
+            roll_into(grid, -1, axis, shifted)
+            np.equal(grid, shifted, out=bonds)
+            self._rng.random(out=rand)
+            np.less(rand, p_add, out=step)
+            bonds &= step
+
+        cluster.fill(False)
+        cluster[self._rng.integers(self.height), self._rng.integers(self.width)] = True
+        size = 1
+        while True:
+            grown[...] = cluster
+            for axis, bonds in enumerate(self._bonds):
+                # Forwards: cells bonded to a cluster cell behind them
+                np.logical_and(cluster, bonds, out=step)
+                roll_into(step, 1, axis, shifted_mask)
+                grown |= shifted_mask
+                # Backwards: cells whose bond points at a cluster cell
+                roll_into(cluster, -1, axis, step)
+                step &= bonds
+                grown |= step
+            cluster[...] = grown
+            new_size = np.count_nonzero(cluster)
+            if new_size == size:
+                break
+            size = new_size
+        if 2 * size > cluster.size:
+            np.logical_not(cluster, out=cluster)
+        np.negative(grid, out=grid, where=cluster)
+
+    def _step(self):
+        """Runs one lattice update and folds it into the temporal average."""
+        self._update_rules[self.algorithm](self)
+        self._steps_run += 1
 
-            # Gradually lower the temperature (simulated annealing)
-            self.temperature = max(
-                self.min_temperature,
-                self.initial_temperature - t * self.annealing_rate,
+        # Gradually lower the temperature (simulated annealing), in
+        # simulated time so the schedule does not depend on the frame rate
+        self.temperature = max(
+            self.min_temperature,
+            self.initial_temperature
+            - self._steps_run / self._clock.rate * self.annealing_rate,
+        )
+        # Remove the old grid from the sum if buffer is full
+        if self._history_filled == self.temporal_window:
+            self._history_sum -= self._history[self._history_ptr]
+        else:
+            self._history_filled += 1
+        # Add the new grid to the sum and buffer
+        self._history[self._history_ptr] = self._grid
+        self._history_sum += self._grid
+        self._history_ptr = (self._history_ptr + 1) % self.temporal_window
+        # Cache the temporally averaged grid once per step
+        np.copyto(self._prev_avg_grid, self._avg_grid)
+        np.divide(self._history_sum, self._history_filled, out=self._avg_grid)
+
+    _update_rules = {
+        "heatbath": _heatbath_step,
+        "metropolis": _metropolis_step,
+        "wolff": _wolff_step,
+    }
+
+    def _warmed_up(self):
+        np.copyto(self._prev_avg_grid, self._avg_grid)
+
+    def get_frame(self, t):
+        """
+        Returns the temporally averaged spins for the whole lattice as an
+        array of values between -1.0 and 1.0. The array is reused between
+        steps, so copy it if it needs to outlive the next call.
+        t: time in seconds (float)
+        """
+        self._advance(t)
+        if self.interpolate:
+            return lerp_into(
+                self._prev_avg_grid, self._avg_grid, self._clock.alpha, self._blend
             )
-            # Remove the old grid from the sum if buffer is full
-            if self._history_filled == self.temporal_window:
-                self._history_sum -= self._history[self._history_ptr]
-            else:
-                self._history_filled += 1
-            # Add the new grid to the sum and buffer
-            self._history[self._history_ptr] = self._grid
-            self._history_sum += self._grid
-            self._history_ptr = (self._history_ptr + 1) % self.temporal_window
-        # Compute the temporally averaged grid (O(1))
-        avg_grid = self._history_sum / self._history_filled
-        xi, yi = int(x) % self.width, int(y) % self.height
-        spin = avg_grid[yi, xi]
-
-        self._last_update = t  # Update last update time
-
-        return float(spin)
-
-    def reset(self, temp=2.0, annealing_rate=None, min_temp=None):
+        return self._avg_grid
+
+    def reset(self, temp=2.0, annealing_rate=None, min_temp=None, algorithm=None):
         """
         Reset the Ising model with a new random configuration.
 
@@ -99,8 +235,8 @@ class IsingModel:
             temp: Initial temperature (default: 2.0)
             annealing_rate: Rate at which temperature decreases per second (default: None, keeps current)
             min_temp: Minimum temperature for annealing (default: None, keeps current)
+            algorithm: Update rule, one of ALGORITHMS (default: None, keeps current)
         """
-        self._grid = np.random.choice([-1, 1], size=(self.height, self.width))
         self.temperature = temp
         self.initial_temperature = temp
 
@@ -110,23 +246,51 @@ class IsingModel:
         if min_temp is not None:
             self.min_temperature = min_temp
 
-        self._history = np.empty(
-            (self.temporal_window, self.height, self.width), dtype=np.float32
-        )
-        self._history[0] = self._grid
-        self._history_ptr = 1
-        self._history_filled = 1
-        self._history_sum = self._grid.astype(np.float32).copy()
+        if algorithm is not None:
+            _check_algorithm(algorithm)
+            self.algorithm = algorithm
 
+        self._reset_state()
 
-# Singleton instance for module-level functions
-_ising_instance = IsingModel()
+
+# Simulated seconds run by prepare() before the animation starts
+BURN_IN_TIME = 10.0
+
+# The reset() arguments each animation starts from
+VARIANTS = {
+    # Faster annealing
+    "Ising Model": (3.0, 0.05, 0.5, "heatbath"),
+    # Higher temperature
+    "Ising Model (High Temp)": (3.5, 0.05, 0.8, "heatbath"),
+    # Cluster updates order quickly at low temperature
+    "Ising Model (Wolff)": (2.6, 0.05, 1.5, "wolff"),
+}
+
+
+def _start(model, name):
+    model.reset(*VARIANTS[name])
+
+
+_lattice = SimulationSlot(
+    lambda width, height, max_steps: IsingModel(width, height, max_steps=max_steps),
+    _start,
+    BURN_IN_TIME,
+)
 
 
 def get_ising_value(t, i, x, y):
-    return _ising_instance.get_ising_value(t, i, x, y)
+    return _lattice.get().get_value(t, i, x, y)
 
 
-def reset_ising_model(temp=2.0, annealing_rate=None, min_temp=None):
-    _ising_instance.reset(temp, annealing_rate, min_temp)
+def reset_ising_model(
+    temp=2.0, annealing_rate=None, min_temp=None, algorithm=None, shape=None
+):
+    _lattice.get(shape).reset(temp, annealing_rate, min_temp, algorithm)
     return True
+
+
+# Simulation behind each animation, prepared through utils.registry
+SIMULATIONS = {name: _lattice for name in VARIANTS}
+
+# Animation entries, looked up by name through utils.registry
+ANIMATIONS = {name: _lattice.animation(name) for name in VARIANTS}
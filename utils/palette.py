@@ -0,0 +1,90 @@
+import numpy as np
+
+# Number of entries in each lookup table
+LUT_SIZE = 512
+
+# --- Gradient Definitions ---
+# Each gradient is a list of (value, (r, g, b)) stops with values in [-1.0, 1.0].
+# Colours are linearly interpolated between neighbouring stops.
+PALETTES = {
+    "Fire": [
+        (-1.0, (0, 0, 0)),
+        (-0.3, (128, 0, 0)),
+        (0.3, (255, 120, 0)),
+        (1.0, (255, 255, 200)),
+    ],
+    "Ocean": [
+        (-1.0, (0, 0, 0)),
+        (-0.2, (0, 40, 120)),
+        (0.5, (0, 160, 200)),
+        (1.0, (200, 255, 255)),
+    ],
+    "Rainbow": [
+        (-1.0, (255, 0, 0)),
+        (-0.5, (255, 255, 0)),
+        (0.0, (0, 255, 0)),
+        (0.5, (0, 0, 255)),
+        (1.0, (255, 0, 255)),
+    ],
+}
+
+
+def two_tone(positive_color, negative_color):
+    """
+    Returns the stops for the classic mapping: black at 0.0, fading up to
+    positive_color at 1.0 and negative_color at -1.0.
+    """
+    return [(-1.0, negative_color), (0.0, (0, 0, 0)), (1.0, positive_color)]
+
+
+class Palette:
+    """
+    Maps float frames in [-1.0, 1.0] to RGB through a precomputed lookup table.
+
+    The field is quantised to LUT_SIZE levels and coloured with a single
+    indexed gather, so the cost per frame does not depend on how many stops
+    the gradient has. Gamma correction is baked into the table.
+    """
+
+    def __init__(self, stops, gamma=1.0, size=LUT_SIZE):
+        stops = sorted(stops, key=lambda stop: stop[0])
+        positions = np.array([value for value, _ in stops], dtype=np.float64)
+        colors = np.array([color for _, color in stops], dtype=np.float64)
+
+        levels = np.linspace(-1.0, 1.0, size)
+        rgb = np.stack(
+            [np.interp(levels, positions, colors[:, c]) for c in range(3)], axis=-1
+        )
+        rgb = 255.0 * (rgb / 255.0) ** gamma
+
+        self.size = size
+        self.lut = np.round(rgb).astype(np.uint8)
+        self._scale = (size - 1) / 2.0
+
+    def indices(self, field):
+        """Quantises a float frame into lookup table indices."""
+        # NaN (e.g. 0/0 in a formula) is shown as 0.0, infinities saturate
+        field = np.nan_to_num(
+            np.asarray(field, dtype=np.float64), nan=0.0, posinf=1.0, neginf=-1.0
+        )
+        np.clip(field, -1.0, 1.0, out=field)
+        field += 1.0
+        field *= self._scale
+        field += 0.5
+        return field.astype(np.intp)
+
+    def map(self, field, out=None):
+        """
+        Returns an (H, W, 3) uint8 image for a float frame of shape (H, W).
+        If out is given the image is written into it instead of allocated.
+        """
+        return np.take(self.lut, self.indices(field), axis=0, out=out)
+
+
+def get_palette(name, positive_color, negative_color, gamma=1.0):
+    """
+    Builds the named gradient from PALETTES, or the two-tone palette from
+    positive_color/negative_color when name is None or unknown.
+    """
+    stops = PALETTES.get(name) or two_tone(positive_color, negative_color)
+    return Palette(stops, gamma=gamma)
@@ -0,0 +1,96 @@
+"""
+Plays recordings made by record.py (see utils.recording) straight from disk.
+
+The file is memory mapped read-only and every frame is a view into the
+mapping, so playback does no per-frame read, decode or copy: the frame
+handed to the display is the page cache itself.
+"""
+
+import math
+import mmap
+import os
+
+import numpy as np
+
+from utils.recording import HEADER, frame_bytes, read_header, recording_path
+
+
+class MappedRecording:
+    """A recording mapped into memory, with frames as an (N, H, W, 3) view."""
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            self.info = read_header(f)
+            # The mapping stays valid after the file is closed
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if hasattr(self._map, "madvise"):
+            self._map.madvise(mmap.MADV_WILLNEED)
+        info = self.info
+        self.frames = np.frombuffer(
+            self._map,
+            dtype=np.uint8,
+            count=info.n_frames * frame_bytes(info),
+            offset=HEADER.size,
+        ).reshape(info.n_frames, info.height, info.width, 3)
+
+    @property
+    def duration(self):
+        """Length of the recording in seconds at its own frame rate."""
+        return self.info.n_frames / self.info.fps
+
+
+class Player:
+    """
+    Maps animation time onto the frames of a MappedRecording.
+
+    render(t) returns the frame to show t seconds into playback, starting
+    at `offset` seconds into the recording and advancing `rate` times as
+    fast as recorded (negative rates play backwards). With loop the
+    recording wraps around, otherwise render(t) returns None once playback
+    runs off either end.
+    """
+
+    def __init__(self, recording, loop=True, rate=1.0, offset=0.0):
+        if recording.info.n_frames == 0:
+            raise ValueError(f"Recording '{recording.path}' has no frames")
+        self.recording = recording
+        self.loop = loop
+        self.rate = rate
+        self.offset = offset
+
+    def index(self, t):
+        """Returns the frame index to show at time t, or None if past the end."""
+        info = self.recording.info
+        n = math.floor((self.offset + t * self.rate) * info.fps)
+        if self.loop:
+            return n % info.n_frames
+        if 0 <= n < info.n_frames:
+            return n
+        return None
+
+    def render(self, t):
+        n = self.index(t)
+        return None if n is None else self.recording.frames[n]
+
+
+def find_recording(directory, name, width, height):
+    """
+    Returns the MappedRecording of the named animation in directory if
+    there is a valid one of the given size with at least one frame,
+    otherwise None.
+    """
+    path = recording_path(directory, name)
+    if not os.path.exists(path):
+        return None
+    try:
+        recording = MappedRecording(path)
+    except (OSError, ValueError) as e:
+        print(f"Ignoring recording {path}: {e}")
+        return None
+    if recording.info.n_frames == 0:
+        print(f"Ignoring recording {path}: it has no frames")
+        return None
+    if (recording.info.width, recording.info.height) != (width, height):
+        return None
+    return recording
@@ -0,0 +1,211 @@
+"""
+Always-on timing of the render loop's stages, per animation.
+
+Each stage keeps its last RING_SIZE durations in a ring buffer (for
+percentiles) and a running histogram over fixed buckets (for the whole
+run), both updated with a few list operations per sample. The render loop
+brackets its stages with time.perf_counter() and calls record(); the
+simulations report their steps through record_stage() while an animation
+is active, and count any steps their catch-up cap dropped (shown under the
+simulate stage as skipped_steps). snapshot() turns it all into a
+JSON-friendly dict.
+"""
+
+import json
+import time
+from bisect import bisect_left
+
+STAGES = ("compute", "simulate", "color", "composite", "push", "sleep")
+RING_SIZE = 600  # 10 seconds at 60 fps
+# Upper bucket edges in seconds, the last bucket takes everything above
+BUCKET_EDGES = (
+    0.0001,
+    0.00025,
+    0.0005,
+    0.001,
+    0.002,
+    0.004,
+    0.008,
+    0.0167,
+    0.0333,
+    0.1,
+    1.0,
+)
+PERCENTILES = (50, 95, 99)
+
+
+def _ms(seconds):
+    return round(seconds * 1000, 3)
+
+
+def _bucket_labels():
+    labels = [f"<={_ms(edge):g}ms" for edge in BUCKET_EDGES]
+    return labels + [f">{_ms(BUCKET_EDGES[-1]):g}ms"]
+
+
+BUCKET_LABELS = _bucket_labels()
+
+
+class StageTimings:
+    """Ring buffer and histogram of one stage's durations in seconds."""
+
+    def __init__(self, size=RING_SIZE):
+        self.ring = [0.0] * size
+        self.histogram = [0] * (len(BUCKET_EDGES) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, seconds):
+        self.ring[self.count % len(self.ring)] = seconds
+        self.histogram[bisect_left(BUCKET_EDGES, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def as_dict(self):
+        recent = sorted(self.ring[: min(self.count, len(self.ring))])
+        summary = {
+            "count": self.count,
+            "mean_ms": _ms(self.total / self.count) if self.count else 0.0,
+            "max_ms": _ms(self.max),
+        }
+        for p in PERCENTILES:
+            index = min(len(recent) - 1, len(recent) * p // 100)
+            summary[f"p{p}_ms"] = _ms(recent[index]) if recent else 0.0
+        summary["histogram"] = {
+            label: n for label, n in zip(BUCKET_LABELS, self.histogram) if n
+        }
+        return summary
+
+
+class AnimationProfile:
+    """The StageTimings of every stage of one animation."""
+
+    def __init__(self, name):
+        self.name = name
+        self.stages = {stage: StageTimings() for stage in STAGES}
+        self._simulated = 0.0
+        self.skipped_steps = 0  # Simulation steps dropped by the catch-up cap
+
+    def record(self, stage, seconds):
+        self.stages[stage].record(seconds)
+        if stage == "simulate":
+            self._simulated += seconds
+
+    def take_simulated(self):
+        """
+        Returns the simulation time recorded since the last call, so the
+        caller can exclude it from the compute stage that contained it.
+        """
+        simulated, self._simulated = self._simulated, 0.0
+        return simulated
+
+    def as_dict(self):
+        summary = {
+            stage: timings.as_dict()
+            for stage, timings in self.stages.items()
+            if timings.count
+        }
+        if self.skipped_steps:
+            summary.setdefault("simulate", {})["skipped_steps"] = self.skipped_steps
+        return summary
+
+
+class Profiler:
+    """Profiles by animation name, and which animation is rendering now."""
+
+    def __init__(self):
+        self.profiles = {}
+        self.active = None
+        self.started = time.time()
+
+    def profile(self, name):
+        """Returns the AnimationProfile of name, creating it if needed."""
+        profile = self.profiles.get(name)
+        if profile is None:
+            profile = self.profiles[name] = AnimationProfile(name)
+        return profile
+
+    def begin(self, name):
+        """Marks name as rendering and returns its AnimationProfile."""
+        self.active = self.profile(name)
+        return self.active
+
+    def end(self):
+        self.active = None
+
+    def snapshot(self):
+        return {
+            "time": round(time.time(), 3),
+            "uptime_s": round(time.time() - self.started, 1),
+            "active": self.active.name if self.active else None,
+            "animations": {
+                name: profile.as_dict() for name, profile in self.profiles.items()
+            },
+        }
+
+
+# Singleton profiler for module-level functions
+_profiler = Profiler()
+
+
+class _ActiveProfile:
+    """
+    Stands in for the AnimationProfile of whichever animation is active
+    when a stage is recorded, for renderers built before their animation
+    starts (or that never do).
+    """
+
+    def record(self, stage, seconds):
+        record_stage(stage, seconds)
+
+    def take_simulated(self):
+        profile = _profiler.active
+        return profile.take_simulated() if profile is not None else 0.0
+
+
+ACTIVE = _ActiveProfile()
+
+
+def profile(name):
+    return _profiler.profile(name)
+
+
+def begin(name):
+    return _profiler.begin(name)
+
+
+def end():
+    _profiler.end()
+
+
+def record_stage(stage, seconds):
+    """Records a stage timing against the active animation, if any."""
+    profile = _profiler.active
+    if profile is not None:
+        profile.record(stage, seconds)
+
+
+def record_skipped_steps(steps):
+    """Counts simulation steps dropped against the active animation, if any."""
+    profile = _profiler.active
+    if profile is not None:
+        profile.skipped_steps += steps
+
+
+def snapshot():
+    return _profiler.snapshot()
+
+
+def dump(path=None):
+    """
+    Prints the snapshot as one JSON line (so it lands in the journal), and
+    also writes it to path if given.
+    """
+    data = snapshot()
+    print(f"Profile: {json.dumps(data)}", flush=True)
+    if path:
+        with open(path, "w") as f:
+            json.dump(data, f, indent=2)
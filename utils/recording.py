@@ -0,0 +1,157 @@
+"""
+Compact on-disk format for recorded animations.
+
+A recording is a 32 byte header followed by the frames as raw (H, W, 3)
+uint8 pixels, one after another, so frame n starts at HEADER.size +
+n * frame_bytes and the file can be memory mapped and sliced directly.
+
+The header is, little endian: the magic b"UPFR", the format version
+(uint16), width and height (uint16), the number of frames (uint32) and the
+frame rate (float64), padded with zeros.
+"""
+
+import os
+import re
+import struct
+from collections import namedtuple
+
+import numpy as np
+
+MAGIC = b"UPFR"
+VERSION = 1
+HEADER = struct.Struct("<4sHHHId10x")
+FILE_SUFFIX = ".rec"
+
+# Browsers slow down GIF frames shorter than 20 ms, so exports are capped
+GIF_MAX_FPS = 50
+
+RecordingInfo = namedtuple("RecordingInfo", "width height n_frames fps")
+
+
+def recording_path(directory, name):
+    """Returns the file path used for the named animation's recording."""
+    slug = re.sub(r"[^a-z0-9]+", "-", name.lower()).strip("-")
+    return os.path.join(directory, slug + FILE_SUFFIX)
+
+
+def frame_bytes(info):
+    return info.width * info.height * 3
+
+
+def read_header(f):
+    """
+    Reads and checks the header from an open binary file, returning a
+    RecordingInfo. Raises ValueError if this is not a complete recording.
+    """
+    data = f.read(HEADER.size)
+    if len(data) != HEADER.size:
+        raise ValueError("Truncated recording header")
+    magic, version, width, height, n_frames, fps = HEADER.unpack(data)
+    if magic != MAGIC:
+        raise ValueError("Not a frame recording")
+    if version != VERSION:
+        raise ValueError(f"Unsupported recording version {version}")
+    info = RecordingInfo(width, height, n_frames, fps)
+    size = os.fstat(f.fileno()).st_size
+    if size != HEADER.size + n_frames * frame_bytes(info):
+        raise ValueError("Recording size does not match its header")
+    return info
+
+
+def read_recording(path):
+    """Returns (info, frames) with frames an (N, H, W, 3) uint8 array."""
+    with open(path, "rb") as f:
+        info = read_header(f)
+        frames = np.fromfile(f, dtype=np.uint8)
+    return info, frames.reshape(info.n_frames, info.height, info.width, 3)
+
+
+class RecordingWriter:
+    """
+    Streams frames into a recording. The file is written under a temporary
+    name and moved into place by close(), once the frame count in the
+    header is final, so a failed render never leaves a partial recording.
+    """
+
+    def __init__(self, path, width, height, fps):
+        self.path = path
+        self.info = RecordingInfo(width, height, 0, float(fps))
+        self._tmp_path = f"{path}.{os.getpid()}.tmp"
+        self._file = open(self._tmp_path, "wb")
+        self._file.write(self._header())
+
+    def _header(self):
+        return HEADER.pack(MAGIC, VERSION, *self.info)
+
+    def write(self, frame):
+        """Appends one (H, W, 3) uint8 frame."""
+        if frame.shape != (self.info.height, self.info.width, 3):
+            raise ValueError(f"Frame shape {frame.shape} does not match recording")
+        self._file.write(np.ascontiguousarray(frame, dtype=np.uint8).data)
+        self.info = self.info._replace(n_frames=self.info.n_frames + 1)
+
+    def close(self):
+        self._file.seek(0)
+        self._file.write(self._header())
+        self._file.close()
+        os.replace(self._tmp_path, self.path)
+
+    def abort(self):
+        self._file.close()
+        os.remove(self._tmp_path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+
+def save_png_strip(path, frames, scale=4, columns=32):
+    """
+    Saves frames as a PNG contact sheet, left to right and wrapping every
+    `columns` frames, each pixel scaled up by `scale`.
+    """
+    from PIL import Image
+
+    frames = list(frames)
+    if not frames:
+        return
+    height, width, _ = frames[0].shape
+    columns = min(columns, len(frames))
+    rows = -(-len(frames) // columns)
+    sheet = np.zeros((rows * height, columns * width, 3), dtype=np.uint8)
+    for n, frame in enumerate(frames):
+        row, column = divmod(n, columns)
+        sheet[
+            row * height : (row + 1) * height,
+            column * width : (column + 1) * width,
+        ] = frame
+    sheet = sheet.repeat(scale, axis=0).repeat(scale, axis=1)
+    Image.fromarray(sheet).save(path)
+
+
+def save_gif(path, frames, fps, scale=4):
+    """
+    Saves frames as a looping GIF played at fps, dropping frames to stay
+    within GIF_MAX_FPS, with each pixel scaled up by `scale`.
+    """
+    from PIL import Image
+
+    step = max(1, int(np.ceil(fps / GIF_MAX_FPS)))
+    images = [
+        Image.fromarray(frame.repeat(scale, axis=0).repeat(scale, axis=1))
+        for frame in frames[::step]
+    ]
+    if not images:
+        return
+    images[0].save(
+        path,
+        save_all=True,
+        append_images=images[1:],
+        duration=round(1000 * step / fps),
+        loop=0,
+    )
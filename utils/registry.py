@@ -0,0 +1,144 @@
+"""
+The animations by name, loaded on first use.
+
+Each built-in animation is registered with the module that defines it, in
+that module's ANIMATIONS dict. Nothing is imported until an animation is
+looked up, so starting the clock loads no animation code, and the Game of
+Life and Ising modules (and their grids) only load when they first run.
+Modules running a simulation also list its utils.simulation.SimulationSlot
+by animation name in SIMULATIONS, so it can be warmed up ahead of time
+(see AnimationRegistry.prepare) and configured for offline rendering (see
+AnimationRegistry.set_max_steps).
+"""
+
+import importlib
+from collections.abc import MutableMapping
+from math import pi
+
+# Built-in animations and the module defining each one. Listed here rather
+# than collected from each module's ANIMATIONS so nothing is imported up
+# front; tests/test_registry.py checks the two agree.
+BUILTIN_ANIMATIONS = {
+    "Plasma": "utils.animations",
+    "Fireworks": "utils.animations",
+    "Animated Smooth Noise": "utils.animations",
+    "Dialogue": "utils.animations",
+    "Spiral": "utils.animations",
+    "Game of Life": "utils.game_of_life",
+    "Game of Life (Big World)": "utils.game_of_life",
+    "Wave Packet": "utils.animations",
+    "Circular Interference": "utils.animations",
+    "Bessel Mode": "utils.animations",
+    "Lissajous Figure": "utils.animations",
+    "Dynamic Magnetic Field": "utils.animations",
+    "Quantum Harmonic Oscillator": "utils.animations",
+    "Double Pendulum Shadow": "utils.animations",
+    "Magnetic Dipole Field": "utils.animations",
+    "Lorenz Slice": "utils.animations",
+    "Ising Model": "utils.ising",
+    "Ising Model (High Temp)": "utils.ising",
+    "Ising Model (Wolff)": "utils.ising",
+}
+
+
+class AnimationRegistry(MutableMapping):
+    """
+    Maps animation names to their (t, i, x, y) functions. Entries given as
+    a module name import that module on first lookup; entries assigned
+    directly (such as the user's formulas) are stored as they are.
+    """
+
+    def __init__(self, modules=None):
+        self._modules = dict(modules or {})  # Name -> module, None if assigned
+        self._functions = {}
+
+    def _simulation(self, name):
+        """The SimulationSlot behind the named animation, or None."""
+        self[name]  # Imports the module
+        module = self._modules[name]
+        if module is None:
+            return None
+        simulations = getattr(importlib.import_module(module), "SIMULATIONS", {})
+        return simulations.get(name)
+
+    def prepare(self, name, shape, stop=None):
+        """
+        Warms the named animation's simulation, if it has one, up for frames
+        of shape (height, width), so that it starts already running instead
+        of from a cold state. Setting the threading.Event stop cuts the
+        warm-up short.
+        """
+        simulation = self._simulation(name)
+        if simulation is not None:
+            simulation.prepare(name, shape, stop)
+
+    def set_max_steps(self, name, shape, max_steps):
+        """
+        Sets the most steps the named animation's simulation, if it has
+        one, catches up in one frame of shape (height, width). Offline
+        renderers pass None: they render at simulated times, so there is
+        no lag to protect against and every step due is run.
+        """
+        simulation = self._simulation(name)
+        if simulation is not None:
+            simulation.set_max_steps(shape, max_steps)
+
+    def __getitem__(self, name):
+        try:
+            return self._functions[name]
+        except KeyError:
+            module = self._modules[name]  # KeyError for unknown names
+        func = importlib.import_module(module).ANIMATIONS[name]
+        self._functions[name] = func
+        return func
+
+    def __setitem__(self, name, func):
+        self._modules[name] = None
+        self._functions[name] = func
+
+    def __delitem__(self, name):
+        del self._modules[name]
+        self._functions.pop(name, None)
+
+    def __iter__(self):
+        return iter(self._modules)
+
+    def __len__(self):
+        return len(self._modules)
+
+    def __contains__(self, name):
+        return name in self._modules
+
+
+ANIMATIONS = AnimationRegistry(BUILTIN_ANIMATIONS)
+
+# --- Palette Assignments ---
+# Optional gradient (a key of utils.palette.PALETTES) per animation. Animations
+# not listed here use the two-tone POSITIVE_COLOR/NEGATIVE_COLOR palette, which
+# keeps 0.0 black and follows the `color positive|negative` command. The
+# gradients colour 0.0 too, so they are opt-in, for example:
+#   "Fireworks": "Fire",
+#   "Circular Interference": "Ocean",
+#   "Lorenz Slice": "Rainbow",
+ANIMATION_PALETTES = {}
+
+# --- Animation Periods ---
+# Period in seconds of animations that repeat exactly in t. One cycle of
+# these can be pre-rendered by utils.frame_cache and replayed instead of
+# evaluating the formula every frame. Stateful or aperiodic animations
+# (Dialogue, Game of Life, Ising) are not listed.
+ANIMATION_PERIODS = {
+    "Plasma": 2 * pi,
+    "Fireworks": 40.0,  # t % 10, t % 8 and t % 2
+    "Animated Smooth Noise": 2 * pi,
+    "Spiral": pi,
+    "Wave Packet": 16.0,
+    "Circular Interference": pi,
+    "Bessel Mode": pi,
+    "Lissajous Figure": 2 * pi,
+    "Dynamic Magnetic Field": 2 * pi,
+    "Quantum Harmonic Oscillator": 2 * pi,
+    "Double Pendulum Shadow": 2 * pi,
+    "Magnetic Dipole Field": pi,
+    "Lorenz Slice": 4 * pi,
+}
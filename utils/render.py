@@ -0,0 +1,106 @@
+import time
+
+import numpy as np
+
+
+def make_grids(width, height):
+    """
+    Returns the (i, x, y) coordinate grids for a width x height display.
+    Each grid has shape (height, width) and is indexed [y, x], with
+    i = y * width + x matching the per-pixel index used by the animations.
+    """
+    y, x = np.indices((height, width))
+    i = y * width + x
+    return i, x, y
+
+
+def _render_per_pixel(func, t, i, x, y):
+    """Evaluates a scalar (t, i, x, y) animation once per pixel."""
+    field = np.empty(x.shape, dtype=np.float64)
+    for idx in np.ndindex(x.shape):
+        field[idx] = func(t, int(i[idx]), int(x[idx]), int(y[idx]))
+    return field
+
+
+def as_frame_animation(func):
+    """
+    Wraps an animation so that it always returns a whole float frame.
+
+    Animations written against NumPy are called once per frame with the full
+    (i, x, y) grids. Legacy scalar lambdas (using the math module or Python
+    branching on pixel values) fail on array input, so the first time that
+    happens the wrapper falls back to evaluating them pixel by pixel.
+    Animations marked `vectorized` (compiled formulas) only run on whole
+    frames, so their errors are raised rather than retried per pixel.
+    """
+    per_pixel = False
+    vectorized = getattr(func, "vectorized", False)
+
+    def frame(t, i, x, y):
+        nonlocal per_pixel
+        if not per_pixel:
+            try:
+                with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+                    field = func(t, i, x, y)
+                return np.broadcast_to(np.asarray(field, dtype=np.float64), x.shape)
+            except (TypeError, ValueError):
+                if vectorized:
+                    raise
+                per_pixel = True
+        return _render_per_pixel(func, t, i, x, y)
+
+    frame.__wrapped__ = func
+    return frame
+
+
+def make_renderer(
+    name,
+    func,
+    geometry,
+    palette,
+    period=None,
+    fps=60,
+    cache=None,
+    profile=None,
+    stop=None,
+):
+    """
+    Returns render(t), giving the animation's (H, W, 3) uint8 frame at time t.
+
+    With a period and a utils.frame_cache.FrameCache, one cycle is rendered
+    (or loaded from disk) up front and render(t) just indexes into it,
+    unless the stop event cuts the rendering short. Otherwise every call
+    evaluates the formula and maps it through palette, recording the
+    "compute" (excluding any simulation steps) and "color" stages in
+    profile, a utils.profiling.AnimationProfile (or ACTIVE), if given.
+    """
+    frame_func = as_frame_animation(func)
+    frames = None
+    if period and cache is not None:
+        frames = cache.cycle(name, frame_func, geometry, palette, period, fps, stop)
+
+    if frames is not None:
+        n_frames = len(frames)
+
+        def render(t):
+            return frames[int(t / period * n_frames) % n_frames]
+
+    elif profile is None:
+
+        def render(t):
+            field = frame_func(t, geometry.i, geometry.x, geometry.y)
+            return palette.map(field)
+
+    else:
+        clock = time.perf_counter
+
+        def render(t):
+            start = clock()
+            field = frame_func(t, geometry.i, geometry.x, geometry.y)
+            computed = clock()
+            rgb = palette.map(field)
+            profile.record("compute", computed - start - profile.take_simulated())
+            profile.record("color", clock() - computed)
+            return rgb
+
+    return render
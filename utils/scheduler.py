@@ -0,0 +1,34 @@
+from datetime import datetime, timedelta
+
+# Longest single sleep. Deadlines are at most a minute away, so this only
+# bounds how long a wall clock jump (NTP, DST) can go unnoticed.
+MAX_SLEEP = 60.0
+# Wake this long after a deadline so the wall clock has really passed it
+WAKE_MARGIN = 0.001
+
+
+def next_minute(now, minutes=None):
+    """
+    Returns the first minute boundary after now, restricted to boundaries
+    whose minute is in `minutes` if given (e.g. ANIMATION_TRIGGER_MINUTES).
+    Returns None if `minutes` contains no valid minute.
+    """
+    boundary = now.replace(second=0, microsecond=0) + timedelta(minutes=1)
+    if minutes is None:
+        return boundary
+    for _ in range(60):
+        if boundary.minute in minutes:
+            return boundary
+        boundary += timedelta(minutes=1)
+    return None
+
+
+def seconds_until(deadline, now=datetime.now, max_sleep=MAX_SLEEP):
+    """
+    Returns how long to sleep for the wall clock to reach deadline, at most
+    max_sleep, or 0 if it has already passed. For use with asyncio.sleep.
+    """
+    remaining = (deadline - now()).total_seconds()
+    if remaining <= 0:
+        return 0.0
+    return min(remaining + WAKE_MARGIN, max_sleep)
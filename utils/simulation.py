@@ -0,0 +1,133 @@
+"""
+The simulations behind the stateful animations (the Game of Life and Ising
+models): their shared base class, and the module-level slot holding each
+one and turning it into animations.
+"""
+
+from utils.stepping import StepClock
+
+
+class Simulation:
+    """
+    A width x height simulation stepped on a fixed timestep (see
+    utils.stepping). Subclasses implement _step(), running one step, and
+    get_frame(t), which calls _advance(t) and returns the float frame of
+    shape (height, width) at animation time t.
+    """
+
+    def __init__(self, width, height, step_rate, max_steps):
+        self.width = width
+        self.height = height
+        self.prepared = None  # Warmed up for the next run, see warm_up()
+        self._clock = StepClock(step_rate, max_steps)
+
+    @property
+    def max_steps(self):
+        """Most steps caught up in one frame, None for every step due."""
+        return self._clock.max_steps
+
+    @max_steps.setter
+    def max_steps(self, max_steps):
+        self._clock.max_steps = max_steps
+
+    def _advance(self, t):
+        """Runs the steps due at time t (see utils.stepping)."""
+        self._clock.run(t, self._step)
+
+    def _warmed_up(self):
+        """Called once warm_up() has run its steps."""
+
+    def warm_up(self, seconds, stop=None):
+        """
+        Runs `seconds` worth of steps ahead of time, so the animation starts
+        from a developed state rather than from its random start. Returns
+        False if the stop event was set before it finished.
+        """
+        for _ in range(int(seconds * self._clock.rate)):
+            if stop is not None and stop.is_set():
+                return False
+            self._step()
+        self._warmed_up()
+        return True
+
+    def get_value(self, t, i, x, y):
+        """
+        Returns the value at pixel (x, y) of the frame at time t, for
+        callers evaluating the animation one pixel at a time.
+        """
+        field = self.get_frame(t)
+        return float(field[int(y) % self.height, int(x) % self.width])
+
+
+# Shape (height, width) of a module-level simulation until frames of another
+# size are asked for
+DEFAULT_SHAPE = (16, 16)
+# Frames before this time (in seconds) start a new run, unless prepared
+START_TIME = 0.1
+# Most steps a module-level simulation catches up in one frame, unless
+# changed with SimulationSlot.set_max_steps()
+MAX_STEPS = 4
+
+
+class SimulationSlot:
+    """
+    The module-level simulation behind one or more animations, built on
+    first use by build(width, height, max_steps) and rebuilt when frames
+    of another shape are asked for.
+
+    Each animation starts a run with start(simulation, name), unless the
+    simulation was warmed up for it by prepare(), which runs burn_in
+    simulated seconds ahead. Modules list their slots by animation name in
+    SIMULATIONS, for utils.registry to prepare and configure.
+    """
+
+    def __init__(self, build, start, burn_in):
+        self._build = build
+        self._start = start
+        self.burn_in = burn_in
+        self.max_steps = MAX_STEPS
+        self.simulation = None
+
+    def get(self, shape=None):
+        """Returns the simulation, rebuilding it if shape (height, width) differs."""
+        simulation = self.simulation
+        if simulation is None or (
+            shape is not None and shape != (simulation.height, simulation.width)
+        ):
+            height, width = shape or DEFAULT_SHAPE
+            simulation = self.simulation = self._build(width, height, self.max_steps)
+        return simulation
+
+    def start(self, name, shape=None):
+        """Starts a new run of the named animation."""
+        self._start(self.get(shape), name)
+
+    def set_max_steps(self, shape=None, max_steps=MAX_STEPS):
+        """Sets the most steps caught up in one frame (see utils.stepping)."""
+        self.max_steps = max_steps
+        self.get(shape).max_steps = max_steps
+
+    def prepare(self, name, shape=None, stop=None):
+        """
+        Starts a run of the named animation and warms it up, cut short if
+        the stop event is set, in which case it is left unprepared and the
+        animation starts afresh.
+        """
+        simulation = self.get(shape)
+        self._start(simulation, name)
+        finished = simulation.warm_up(self.burn_in, stop)
+        simulation.prepared = name if finished else None
+
+    def animation(self, name):
+        """Returns the named (t, i, x, y) animation showing the simulation."""
+
+        def animation(t, i, x, y):
+            simulation = self.get(x.shape)
+            if t <= START_TIME:
+                if simulation.prepared != name:
+                    self._start(simulation, name)
+            else:
+                simulation.prepared = None  # In use, the next run starts afresh
+            return simulation.get_frame(t)
+
+        return animation
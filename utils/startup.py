@@ -0,0 +1,77 @@
+"""
+Keeps service startup short and measures it.
+
+lazy_import() defers a module until it is first used, so the clock face can
+be drawn before the rest of the service (asyncio, the control socket, the
+animations) has loaded. StartupTimer records how long each phase took, for
+main.py --startup-time.
+"""
+
+import importlib.util
+import os
+import sys
+import time
+
+
+def lazy_import(name):
+    """
+    Returns the module `name`, but only executes it when one of its
+    attributes is first accessed (see importlib.util.LazyLoader).
+    """
+    module = sys.modules.get(name)
+    if module is not None:
+        return module
+    spec = importlib.util.find_spec(name)
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+    return module
+
+
+def process_age():
+    """
+    Seconds since this process was started, read from /proc (so with the
+    kernel's clock tick resolution, usually 10 ms), or None if unavailable.
+    """
+    try:
+        with open("/proc/self/stat") as f:
+            # Fields after the command name, which may itself contain spaces
+            fields = f.read().rpartition(")")[2].split()
+        with open("/proc/uptime") as f:
+            uptime = float(f.read().split()[0])
+        return uptime - int(fields[19]) / os.sysconf("SC_CLK_TCK")
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+class StartupTimer:
+    """Time since the timer was created, split into named phases."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        # Interpreter startup before this point, where it can be measured
+        self.before = process_age()
+        self.marks = []
+
+    def mark(self, phase):
+        """Ends the named phase now."""
+        self.marks.append((phase, time.perf_counter()))
+
+    def elapsed(self):
+        """Seconds from the timer's creation to the last mark."""
+        return self.marks[-1][1] - self.started if self.marks else 0.0
+
+    def report(self):
+        lines = []
+        if self.before is not None:
+            lines.append(f"{'interpreter':<16} {self.before * 1000:8.1f} ms")
+        previous = self.started
+        for phase, at in self.marks:
+            lines.append(f"{phase:<16} {(at - previous) * 1000:8.1f} ms")
+            previous = at
+        lines.append(
+            f"{'total':<16} {self.elapsed() * 1000:8.1f} ms after imports began"
+        )
+        return "\n".join(lines)
@@ -0,0 +1,72 @@
+import time
+
+import numpy as np
+
+from utils.profiling import record_skipped_steps, record_stage
+
+
+class StepClock:
+    """
+    Fixed-timestep scheduler for stateful animations.
+
+    A simulation asks advance(t) how many steps are due at animation time t
+    and runs exactly that many, so it evolves at `rate` steps per second
+    however fast frames are rendered. When rendering lags, the missed steps
+    are caught up, at most `max_steps` per frame; anything beyond that is
+    skipped so a slow frame cannot snowball into ever longer ones. Offline
+    renderers pass max_steps=None to run every step however many are due.
+    """
+
+    def __init__(self, rate, max_steps=4):
+        self.rate = rate
+        self.max_steps = max_steps
+        self.reset()
+
+    def reset(self):
+        self.steps = 0  # Steps actually run
+        self.skipped = 0  # Steps dropped by the max_steps cap
+        self.alpha = 0.0  # Fraction of the way to the next step
+        self._due = 0
+
+    def advance(self, t):
+        """Returns the number of steps to run to bring the simulation up to t."""
+        due_float = t * self.rate
+        due = int(due_float)
+        self.alpha = due_float - due
+        if due <= self._due:
+            # Nothing due yet, or time went backwards (a restarted animation)
+            if due < self._due:
+                self._due = due
+            return 0
+        steps = due - self._due
+        self._due = due
+        if self.max_steps is not None and steps > self.max_steps:
+            self.skipped += steps - self.max_steps
+            steps = self.max_steps
+        self.steps += steps
+        return steps
+
+    def run(self, t, step):
+        """
+        Calls step() once for every step due at time t (see advance) and
+        records the time taken as the "simulate" stage in utils.profiling,
+        along with any steps the max_steps cap dropped.
+        """
+        skipped = self.skipped
+        steps = self.advance(t)
+        if self.skipped != skipped:
+            record_skipped_steps(self.skipped - skipped)
+        if steps:
+            start = time.perf_counter()
+            for _ in range(steps):
+                step()
+            record_stage("simulate", time.perf_counter() - start)
+        return steps
+
+
+def lerp_into(previous, current, alpha, out):
+    """Writes previous + alpha * (current - previous) into out and returns it."""
+    np.subtract(current, previous, out=out)
+    out *= alpha
+    out += previous
+    return out